@@ -0,0 +1,114 @@
+from typing import Optional, Dict, Any, List
+import logging
+import json
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# Product states, in the order a product moves through them
+FETCHED = 'fetched'        # seen on a listing page
+EXTRACTED = 'extracted'    # product page scraped
+PERSISTED = 'persisted'    # saved to PocketBase (or confirmed unchanged)
+FAILED = 'failed'          # could not be scraped or saved, retried on resume
+
+class CrawlFrontier:
+    """Persistent crawl state that lets an interrupted scrape resume where it stopped.
+
+    An SQLite file records the total page count, which listing pages were completed and how far
+    each product URL got, along with its listing row. A fresh run clears the state; a resumed run
+    skips completed listing pages and products that were already persisted, and retries the rest,
+    including unfinished products of completed pages from their stored listing rows.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.resume = resume
+
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                page INTEGER PRIMARY KEY,
+                done REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS products (
+                url TEXT PRIMARY KEY,
+                page INTEGER,
+                listing TEXT,
+                status TEXT NOT NULL,
+                updated REAL NOT NULL
+            );
+        """)
+
+        if resume:
+            logger.info(f"Resuming crawl from {path}: {self.summary()}")
+        else:
+            self.db.executescript('DELETE FROM meta; DELETE FROM pages; DELETE FROM products;')
+            logger.info(f"Started new crawl state in {path}")
+
+    def total_pages(self) -> Optional[int]:
+        """Page count recorded by the run being resumed."""
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'total_pages'").fetchone()
+        return int(row['value']) if row else None
+
+    def set_total_pages(self, total_pages: int) -> None:
+        """Record the listing page count."""
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('total_pages', ?)", (str(total_pages),))
+
+    def is_page_done(self, page: int) -> bool:
+        """Check whether every product of a listing page was processed."""
+        return self.db.execute('SELECT 1 FROM pages WHERE page = ?', (page,)).fetchone() is not None
+
+    def mark_page_done(self, page: int) -> None:
+        """Record that every product of a listing page was processed."""
+        self.db.execute('INSERT OR REPLACE INTO pages (page, done) VALUES (?, ?)', (page, time.time()))
+
+    def add_products(self, listings: Dict[str, Dict[str, Any]], page: int) -> None:
+        """Record the listing rows of a page by product URL, keeping the state of known products."""
+        now = time.time()
+        self.db.executemany(
+            'INSERT OR IGNORE INTO products (url, page, listing, status, updated) VALUES (?, ?, ?, ?, ?)',
+            [(url, page, json.dumps(listing, ensure_ascii=False), FETCHED, now) for url, listing in listings.items()]
+        )
+
+    def unfinished_listings(self) -> List[Dict[str, Any]]:
+        """Listing rows of completed pages whose products were not persisted."""
+        rows = self.db.execute(
+            'SELECT products.listing FROM products JOIN pages ON pages.page = products.page '
+            'WHERE products.status != ? AND products.listing IS NOT NULL',
+            (PERSISTED,)
+        ).fetchall()
+        return [json.loads(row['listing']) for row in rows]
+
+    def product_status(self, url: str) -> Optional[str]:
+        """State of a product URL, or None if it was not seen yet."""
+        row = self.db.execute('SELECT status FROM products WHERE url = ?', (url,)).fetchone()
+        return row['status'] if row else None
+
+    def mark_product(self, url: str, status: str) -> None:
+        """Move a product URL to a new state."""
+        self.db.execute(
+            'INSERT INTO products (url, status, updated) VALUES (?, ?, ?) '
+            'ON CONFLICT (url) DO UPDATE SET status = excluded.status, updated = excluded.updated',
+            (url, status, time.time())
+        )
+
+    def summary(self) -> Dict[str, int]:
+        """Number of completed pages and of products in each state."""
+        counts = {
+            row['status']: row['count']
+            for row in self.db.execute('SELECT status, COUNT(*) AS count FROM products GROUP BY status')
+        }
+        counts['pages_done'] = self.db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+        return counts
+
+    def close(self) -> None:
+        """Close the state database."""
+        self.db.close()
@@ -0,0 +1,238 @@
+from typing import Optional, Dict, Any, List, IO
+from pathlib import Path
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+class ImageCacheWriter:
+    """Writes a downloaded image into the cache while hashing it."""
+
+    def __init__(self, cache: 'ImageCache', url: str, content_type: str,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.cache = cache
+        self.url = url
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+        fd, self.temp_path = tempfile.mkstemp(dir=cache.blobs_dir, suffix='.part')
+        self.file = os.fdopen(fd, 'wb')
+
+    def write(self, chunk: bytes) -> None:
+        """Write a chunk of image data."""
+        self.file.write(chunk)
+        self.hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> str:
+        """Move the image to its content address and index it, returning the SHA-256 digest."""
+        self.file.close()
+        digest = self.hash.hexdigest()
+        blob_path = self.cache.blob_path(digest)
+
+        if blob_path.exists():
+            # Same content was already stored, e.g. a banner shared by several products
+            os.remove(self.temp_path)
+        else:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.temp_path, blob_path)
+
+        self.cache._register(self.url, digest, self.size, self.content_type, self.etag, self.last_modified)
+        return digest
+
+    def abort(self) -> None:
+        """Discard a partially written image."""
+        try:
+            self.file.close()
+            os.remove(self.temp_path)
+        except OSError as e:
+            logger.warning(f"Could not remove partial cache file {self.temp_path}: {e}")
+
+class LeasedBlob(io.BufferedReader):
+    """A stored image opened for reading; the cache does not evict it until it is closed."""
+
+    def __init__(self, cache: 'ImageCache', digest: str):
+        super().__init__(io.FileIO(str(cache.blob_path(digest)), 'rb'))
+        self.cache = cache
+        self.digest = digest
+        cache._leases[digest] = cache._leases.get(digest, 0) + 1
+
+    def close(self) -> None:
+        if not self.closed:
+            leases = self.cache._leases.get(self.digest, 1) - 1
+            if leases > 0:
+                self.cache._leases[self.digest] = leases
+            else:
+                self.cache._leases.pop(self.digest, None)
+        super().close()
+
+class ImageCache:
+    """Content-addressed on-disk image cache shared by the scrapers.
+
+    Images are stored once under their SHA-256 digest, so files shared by several products or
+    seen again in later runs are only downloaded and stored once. An SQLite index maps source
+    URLs to digests, keeps the ETag/Last-Modified headers used to revalidate them, and remembers
+    which digests were uploaded to which PocketBase record under which file name. The least
+    recently used images are evicted once the cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 * 1024 * 1024, max_age: int = 24 * 60 * 60):
+        self.cache_dir = Path(cache_dir)
+        self.blobs_dir = self.cache_dir / 'blobs'
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # Entries checked more recently than this are used without revalidation
+        self.max_age = max_age
+        # Open readers per digest; leased images are not evicted
+        self._leases: Dict[str, int] = {}
+
+        self.db = sqlite3.connect(str(self.cache_dir / 'index.db'), timeout=30, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                checked REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS urls_digest ON urls (digest);
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS uploads (
+                record_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                file_name TEXT,
+                PRIMARY KEY (record_id, position)
+            );
+        """)
+        logger.info(f"Image cache opened at {self.cache_dir}")
+
+    def blob_path(self, digest: str) -> Path:
+        """Path of the stored image with the given digest."""
+        return self.blobs_dir / digest[:2] / digest
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cache entry for a source URL, or None if it is unknown or was evicted."""
+        row = self.db.execute('SELECT * FROM urls WHERE url = ?', (url,)).fetchone()
+        if not row:
+            return None
+        if not self.blob_path(row['digest']).exists():
+            self.db.execute('DELETE FROM urls WHERE url = ?', (url,))
+            return None
+        return dict(row)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Check whether an entry was validated recently enough to skip revalidation."""
+        return time.time() - entry['checked'] < self.max_age
+
+    def revalidation_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Conditional request headers for revalidating an entry."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def mark_revalidated(self, url: str) -> None:
+        """Record that the server confirmed a cached URL is unchanged."""
+        self.db.execute('UPDATE urls SET checked = ? WHERE url = ?', (time.time(), url))
+
+    def writer(self, url: str, content_type: str, etag: Optional[str] = None,
+               last_modified: Optional[str] = None) -> ImageCacheWriter:
+        """Start writing a downloaded image into the cache."""
+        return ImageCacheWriter(self, url, content_type, etag, last_modified)
+
+    def open(self, digest: str) -> IO[bytes]:
+        """Open a stored image for reading and mark it as recently used."""
+        self.db.execute('UPDATE blobs SET last_used = ? WHERE digest = ?', (time.time(), digest))
+        return LeasedBlob(self, digest)
+
+    def uploaded_digests(self, record_id: str) -> List[str]:
+        """Digests of the images last uploaded to a PocketBase record, in upload order."""
+        rows = self.db.execute(
+            'SELECT digest FROM uploads WHERE record_id = ? ORDER BY position', (record_id,)
+        ).fetchall()
+        return [row['digest'] for row in rows]
+
+    def record_uploads(self, record_id: str, digests: List[str], file_names: List[Optional[str]]) -> None:
+        """Remember which images, and under which PocketBase file names, a record now has."""
+        self.db.execute('BEGIN')
+        try:
+            self.db.execute('DELETE FROM uploads WHERE record_id = ?', (record_id,))
+            self.db.executemany(
+                'INSERT INTO uploads (record_id, position, digest, file_name) VALUES (?, ?, ?, ?)',
+                [
+                    (record_id, position, digest, file_names[position] if position < len(file_names) else None)
+                    for position, digest in enumerate(digests)
+                ]
+            )
+            self.db.execute('COMMIT')
+        except Exception:
+            self.db.execute('ROLLBACK')
+            raise
+
+    def _register(self, url: str, digest: str, size: int, content_type: str,
+                  etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Index a committed image and evict old ones if the cache is over its size limit."""
+        now = time.time()
+        self.db.execute(
+            'INSERT OR REPLACE INTO urls (url, digest, content_type, etag, last_modified, checked) VALUES (?, ?, ?, ?, ?, ?)',
+            (url, digest, content_type, etag, last_modified, now)
+        )
+        self.db.execute(
+            'INSERT INTO blobs (digest, size, last_used) VALUES (?, ?, ?) '
+            'ON CONFLICT (digest) DO UPDATE SET last_used = excluded.last_used',
+            (digest, size, now)
+        )
+        # The image just written is about to be read by the caller
+        self.evict(keep=digest)
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Remove the least recently used images until the cache fits ``max_bytes``, returning the bytes freed.
+
+        Images that are open for reading, the ``keep`` digest, and images whose file can't be
+        removed (Windows refuses to delete open files) are kept.
+        """
+        total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        freed = 0
+        for row in self.db.execute('SELECT digest, size FROM blobs ORDER BY last_used').fetchall():
+            if total - freed <= self.max_bytes:
+                break
+            if row['digest'] == keep or row['digest'] in self._leases:
+                continue
+            try:
+                self.blob_path(row['digest']).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.debug(f"Keeping cached image {row['digest']} that could not be removed: {e}")
+                continue
+            self.db.execute('DELETE FROM blobs WHERE digest = ?', (row['digest'],))
+            self.db.execute('DELETE FROM urls WHERE digest = ?', (row['digest'],))
+            freed += row['size']
+
+        logger.info(f"Evicted {freed} bytes from the image cache")
+        return freed
+
+    def close(self) -> None:
+        """Close the cache index."""
+        self.db.close()
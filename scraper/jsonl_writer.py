@@ -0,0 +1,222 @@
+from typing import Optional, Dict, Any, IO, Iterator
+import logging
+import json
+import gzip
+import os
+import tempfile
+import time
+import zlib
+
+# zstandard is optional, gzip from the standard library works everywhere
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+# Raised while decompressing a file cut off or damaged by an interrupted run
+DAMAGED_DATA_ERRORS = (EOFError, zlib.error) + ((zstandard.ZstdError,) if ZSTD_AVAILABLE else ())
+
+def _new_decompressor(compression: str) -> Any:
+    """Decompressor for a single gzip member or zstd frame."""
+    if compression == 'gzip':
+        return zlib.decompressobj(wbits=31)
+    return zstandard.ZstdDecompressor().decompressobj()
+
+def _frame_chunks(path: str, compression: str, state: Dict[str, Any]) -> Iterator[bytes]:
+    """Decompress the gzip members or zstd frames of a file in turn, stopping where the data ends or breaks.
+
+    Unlike ``gzip.open`` or a zstd stream reader this yields everything that was synced to an
+    unfinished last frame. ``state`` receives the file offset where the last frame starts
+    (``member_start``) and whether that frame is unfinished (``truncated``).
+    """
+    state.update(member_start=0, truncated=False)
+    decompressor = _new_decompressor(compression)
+    in_member = False
+    offset = 0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(64 * 1024)
+            if not data:
+                break
+            offset += len(data)
+            while data:
+                if not in_member:
+                    state['member_start'] = offset - len(data)
+                    in_member = True
+                try:
+                    chunk = decompressor.decompress(data)
+                except DAMAGED_DATA_ERRORS:
+                    state['truncated'] = True
+                    return
+                if chunk:
+                    yield chunk
+                if decompressor.eof:
+                    data = decompressor.unused_data
+                    decompressor = _new_decompressor(compression)
+                    in_member = False
+                else:
+                    data = b''
+    state['truncated'] = in_member
+
+class JsonlWriter:
+    """Append-only JSON Lines checkpoint file.
+
+    Each record is written as one compact line as soon as it is scraped, so memory stays flat
+    however large the catalogue is and a crash loses at most the records since the last sync.
+    The file is flushed and fsynced every ``sync_every`` records or ``sync_interval`` seconds.
+    With ``compression`` set to 'gzip' or 'zstd' the lines are compressed as a stream; the
+    output can be read with ``zcat``/``zstdcat`` even if the run is interrupted.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None, append: bool = False,
+                 sync_every: int = 50, sync_interval: float = 5.0):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == 'zstd' and not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression needs the zstandard package (pip install zstandard)")
+
+        suffix = COMPRESSION_SUFFIXES[compression]
+        self.path = path if path.endswith(suffix) else path + suffix
+        self.compression = compression
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+
+        self.count = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        # A gzip member or zstd frame left unfinished by a crash would corrupt everything appended after it
+        recovered = self._unfinished_frame_lines() if append and compression else None
+
+        # Compressed streams are appended as new gzip members / zstd frames, which readers concatenate
+        self._raw = open(self.path, 'ab' if append else 'wb')
+        self._stream: IO[bytes]
+        if compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='wb')
+        elif compression == 'zstd':
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+        if recovered:
+            # Rewrite the complete lines of the cut-off member as the start of a new one
+            with recovered:
+                recovered.seek(0)
+                while True:
+                    chunk = recovered.read(64 * 1024)
+                    if not chunk:
+                        break
+                    self._stream.write(chunk)
+            self.sync()
+        logger.info(f"Writing checkpoint to {self.path}")
+
+    def _unfinished_frame_lines(self) -> Optional[IO[bytes]]:
+        """Cut an unfinished last gzip member or zstd frame off the checkpoint and return its complete lines.
+
+        Returns None when the file is missing or intact.
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return None
+
+        # Keep the decompressed lines of the current frame; older frames are complete
+        state: Dict[str, Any] = {}
+        lines = tempfile.TemporaryFile()
+        member_start = 0
+        tail = b''
+        for chunk in _frame_chunks(self.path, self.compression, state):
+            if state['member_start'] != member_start:
+                member_start = state['member_start']
+                lines.seek(0)
+                lines.truncate()
+                tail = b''
+            data = tail + chunk
+            cut = data.rfind(b'\n') + 1
+            lines.write(data[:cut])
+            tail = data[cut:]
+        if not state['truncated']:
+            lines.close()
+            return None
+
+        if state['member_start'] != member_start:
+            # The broken member yielded nothing
+            lines.seek(0)
+            lines.truncate()
+        logger.warning(f"Checkpoint {self.path} ends in an unfinished {self.compression} frame, repairing it before appending")
+        os.truncate(self.path, state['member_start'])
+        return lines
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append one record, syncing to disk when a sync is due."""
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + '\n'
+        self._stream.write(line.encode('utf-8'))
+        self.count += 1
+        self._unsynced += 1
+
+        if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush buffered (and compressed) data and fsync the file."""
+        if self.compression == 'zstd':
+            self._stream.flush(zstandard.FLUSH_BLOCK)
+        else:
+            self._stream.flush()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Finish the compressed stream, sync and close the file."""
+        if self._raw.closed:
+            return
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        logger.info(f"Saved {self.count} records to {self.path}")
+
+def _frame_lines(path: str, compression: str) -> Iterator[str]:
+    """Yield the lines of a compressed file, stopping with a warning at an unfinished or broken end."""
+    state: Dict[str, Any] = {}
+    tail = b''
+    for chunk in _frame_chunks(path, compression, state):
+        data = tail + chunk
+        cut = data.rfind(b'\n') + 1
+        for line in data[:cut].splitlines():
+            yield line.decode('utf-8', errors='replace')
+        tail = data[cut:]
+    if state['truncated']:
+        logger.warning(f"{path} ends in an unfinished {compression} frame, probably from an interrupted run; read up to there")
+    if tail:
+        yield tail.decode('utf-8', errors='replace')
+
+def read_jsonl(path: str, compression: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Read the records of a checkpoint written by ``JsonlWriter``, skipping a truncated last line.
+
+    A compressed file cut off by an interrupted run is read up to where its data ends.
+    """
+    stream: Optional[IO[str]] = None
+    if compression:
+        lines: Iterator[str] = _frame_lines(path, compression)
+    else:
+        stream = open(path, 'r', encoding='utf-8')
+        lines = stream
+
+    try:
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # An interrupted run can leave a partial line at the end
+                logger.warning(f"Skipping unreadable line in {path}")
+    except DAMAGED_DATA_ERRORS as e:
+        logger.warning(f"Stopped reading {path} at damaged data: {e}")
+    finally:
+        if stream:
+            stream.close()
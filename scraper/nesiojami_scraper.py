@@ -1,28 +1,43 @@
-from typing import Optional, Dict, Any, List
-from playwright.async_api import async_playwright, Page, ElementHandle, Browser, BrowserContext
+from typing import Optional, Dict, Any, List, Tuple, IO
+from playwright.async_api import async_playwright, Page
 from datetime import datetime
 import logging
 import json
 import asyncio
 import os
-from pocketbase import PocketBase
 from dotenv import load_dotenv
 import re
 import aiohttp
 from aiohttp import ClientTimeout
 import tempfile
-from pathlib import Path
-import io
-from urllib.parse import urljoin
+import hashlib
+import time
+import argparse
+from urllib.parse import urljoin, urlparse
+from image_cache import ImageCache
+from pocketbase_client import AsyncPocketBase
+from upsert_writer import UpsertWriter
+from jsonl_writer import JsonlWriter, COMPRESSION_SUFFIXES, ZSTD_AVAILABLE
+from crawl_frontier import CrawlFrontier, EXTRACTED, PERSISTED, FAILED
+from readiness import ReadinessWaiter
+from resource_blocking import ResourceBlocker
+from page_pool import PagePool
+from sharding import run_sharded
+from rate_limiter import RateLimiter, CircuitOpenError
+from pocketbase.utils import ClientResponseError
 
-# Try to import requests, provide helpful error if not installed
+# BeautifulSoup is only needed for the browserless (HTTP) mode
 try:
-    import requests  # Add requests module import for file uploads
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
 except ImportError:
-    print("ERROR: The 'requests' module is required but not installed.")
-    print("Please install it using: pip install requests")
-    import sys
-    sys.exit(1)
+    BS4_AVAILABLE = False
+
+try:
+    import lxml  # noqa: F401 - only checked so BeautifulSoup can use the faster parser
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(
@@ -31,9 +46,139 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# In-page script that reads every listing row and the pagination in one evaluate call.
+# Each row has the same fields as SkytechScraper.parse_listing_row returns.
+LISTING_PAGE_SCRIPT = """
+() => {
+    const text = (el) => (el ? el.textContent : null);
+    const attr = (el, name) => (el ? el.getAttribute(name) : null);
+
+    const listings = Array.from(document.querySelectorAll('table.productListing tr.productListing'), (row) => {
+        const nameCell = row.querySelector('td.name a');
+        if (!nameCell) {
+            return null;
+        }
+        const stockCell = row.querySelector('td.kiekis');
+        return {
+            href: nameCell.getAttribute('href'),
+            name: nameCell.textContent,
+            image_src: attr(row.querySelector('td.image img'), 'src'),
+            price_text: text(row.querySelector('td strong')),
+            stock_text: text(stockCell),
+            stock_class: attr(stockCell, 'class'),
+        };
+    });
+
+    let totalPages = 1;
+    for (const link of document.querySelectorAll('tr td:has(a[href*="page="]) a')) {
+        const match = /page=(\\d+)/.exec(link.getAttribute('href') || '');
+        if (match) {
+            totalPages = Math.max(totalPages, parseInt(match[1], 10));
+        }
+    }
+
+    return { listings, total_pages: totalPages };
+}
+"""
+
+# In-page script that collects the raw product page payload in one evaluate call.
+# SkytechScraper._product_payload_from_soup builds the same payload from plain HTML.
+PRODUCT_PAGE_SCRIPT = """
+() => {
+    const text = (el) => (el ? el.textContent : null);
+    const attr = (el, name) => (el ? el.getAttribute(name) : null);
+    const cellRows = (table) => (table
+        ? Array.from(table.querySelectorAll('tr'), (row) => Array.from(row.querySelectorAll('td'), (td) => td.textContent))
+        : []);
+
+    // Activate the description tab so its content gets rendered
+    let descriptionTabClicked = false;
+    const descriptionTab = document.querySelector('#tab_description');
+    if (descriptionTab) {
+        const tabClass = descriptionTab.getAttribute('class');
+        if (tabClass && !tabClass.includes('selected')) {
+            descriptionTab.click();
+            descriptionTabClicked = true;
+        }
+    }
+
+    const productInfo = document.querySelector('div.productInfoMain');
+    const description = document.querySelector('#tab-description, div.tab-container, div.description-text');
+    const features = document.querySelector('div.productFeatures');
+
+    return {
+        info: productInfo ? {
+            model: text(productInfo.querySelector('div.model')),
+            price: text(productInfo.querySelector('span.productPrice')),
+            brand: text(productInfo.querySelector('div.brand a')),
+        } : null,
+        spec_rows: Array.from(document.querySelectorAll('table.produktas')).flatMap(cellRows),
+        description: description ? {
+            text: description.textContent,
+            items: Array.from(description.querySelectorAll('div.description-text, p, li'), (item) => ({
+                key: text(item.querySelector('strong, b')),
+                text: item.textContent,
+            })),
+        } : null,
+        technical_rows: cellRows(document.querySelector('table.technical-parameters')),
+        features: features ? Array.from(features.querySelectorAll('li'), (item) => item.textContent) : [],
+        title: document.title,
+        meta_description: attr(document.querySelector('meta[name="description"]'), 'content'),
+        zoom_href: attr(document.querySelector('a#zoom1'), 'href'),
+        zoom_img_src: attr(document.querySelector('a#zoom1 img'), 'src'),
+        gallery_hrefs: Array.from(document.querySelectorAll('div.additionalImages a, div.imageGallery a'), (link) => link.getAttribute('href')),
+        hidden_hrefs: Array.from(document.querySelectorAll('div[style*="display:none"] a[href*="images/"], div.hidden a[href*="images/"]'), (link) => link.getAttribute('href')),
+        ld_json: text(document.querySelector('script[type="application/ld+json"]')),
+        description_tab_clicked: descriptionTabClicked,
+    };
+}
+"""
+
+# Readiness condition for the description tab content after the tab was clicked
+DESCRIPTION_READY_SCRIPT = """
+() => {
+    const description = document.querySelector('#tab-description, div.tab-container, div.description-text');
+    return Boolean(description && description.textContent.trim());
+}
+"""
+
 class SkytechScraper:
-    def __init__(self):
-        """Initialize the scraper for desktop computers from skytech.lt"""
+    # URL globs the browser keeps loading even though their resource type is blocked
+    RESOURCE_ALLOWLIST: List[str] = []
+
+    def __init__(self, concurrency: int = 4, mode: str = 'http', full_sync: bool = False, listing_concurrency: int = 3,
+                 image_downloads: int = 8, image_uploads: int = 4,
+                 image_buffer_bytes: int = 5 * 1024 * 1024, image_spill: bool = True,
+                 image_cache_dir: Optional[str] = None, image_cache_bytes: int = 2 * 1024 * 1024 * 1024,
+                 batch_size: int = 50, dead_letter_path: str = 'skytech_dead_letter.jsonl',
+                 checkpoint_path: str = 'skytech_desktop_products.jsonl', checkpoint_compression: Optional[str] = None,
+                 state_path: str = 'skytech_crawl_state.db', resume: bool = False,
+                 block_resources: bool = True, page_max_uses: int = 50,
+                 request_rate: float = 4.0, max_request_rate: float = 16.0,
+                 shard_index: int = 0, shard_count: int = 1):
+        """Initialize the scraper for desktop computers from skytech.lt
+
+        ``mode`` is either 'http' (fetch and parse HTML, using the browser only for pages
+        that need JavaScript) or 'browser' (render every page with Playwright).
+        ``full_sync`` re-scrapes and rewrites products even when their fingerprint is unchanged.
+        ``listing_concurrency`` limits the listing pages fetched at once ahead of the product workers.
+        ``image_downloads`` and ``image_uploads`` limit the image transfers running at once.
+        ``image_buffer_bytes`` is the in-memory buffer per image; larger images spill to a temporary
+        file, or are skipped when ``image_spill`` is False.
+        ``image_cache_dir`` enables the content-addressed image cache shared across products and runs.
+        ``batch_size`` is the number of product writes sent to PocketBase per batch; products that
+        fail to save are appended to ``dead_letter_path``.
+        Every scraped product is appended to the JSONL checkpoint ``checkpoint_path``, optionally
+        compressed with ``checkpoint_compression`` ('gzip' or 'zstd').
+        Crawl progress is recorded in ``state_path``; with ``resume`` the scrape continues from the
+        state of the previous run instead of starting over.
+        ``block_resources`` stops the browser from loading images, fonts, stylesheets, media and
+        trackers, except for URLs in ``RESOURCE_ALLOWLIST``.
+        ``page_max_uses`` is the number of navigations after which a pooled browser page is replaced.
+        ``request_rate`` is the starting requests per second per host (shop, image CDNs); the rate adapts
+        to the host's responses up to ``max_request_rate``.
+        ``shard_index`` and ``shard_count`` restrict the crawl to this shard's listing pages (see sharding.py).
+        """
         self.base_url = "https://www.skytech.lt"
         self.category_url = f"{self.base_url}/staliniai-kompiuteriai-firminiai-kompiuteriai-branded-c-86_32_564.html"
         
@@ -44,38 +189,104 @@ class SkytechScraper:
         
         # Number of products per page (for pagination)
         self.products_per_page = 100
+        
+        # Number of product detail pages processed in parallel
+        self.concurrency = max(1, concurrency)
+        
+        # Number of listing pages fetched in parallel ahead of the product workers
+        self.listing_concurrency = max(1, listing_concurrency)
+        self._pending_rows: Dict[int, int] = {}
+        
+        # Listing pages are split across shard processes by page number
+        self.shard_index = shard_index
+        self.shard_count = max(1, shard_count)
+        
+        if mode not in ('http', 'browser'):
+            raise ValueError(f"Unknown scraper mode: {mode}")
+        if mode == 'http' and not BS4_AVAILABLE:
+            logger.warning("beautifulsoup4 is not installed, falling back to browser mode (pip install beautifulsoup4 lxml)")
+            mode = 'browser'
+        self.mode = mode
+        
+        # Image pipeline limits, shared by all product workers
+        self.image_download_semaphore = asyncio.Semaphore(max(1, image_downloads))
+        self.image_upload_semaphore = asyncio.Semaphore(max(1, image_uploads))
+        self.image_buffer_bytes = image_buffer_bytes
+        self.image_spill = image_spill
+        self.image_cache = ImageCache(image_cache_dir, max_bytes=image_cache_bytes) if image_cache_dir else None
+        
+        # Delta sync: products whose fingerprint is unchanged are skipped
+        self.full_sync = full_sync
+        self.skipped_products = 0
+        
+        # Stored skytech products, loaded once at startup
+        self.existing_by_url: Dict[str, Any] = {}
+        self.existing_by_slug: Dict[str, Any] = {}
             
-        self.page = None
+        self.playwright = None
         self.browser = None
         self.context = None
-        self.products_data = []
+        # Warm browser pages leased per navigation, created with the browser
+        self.page_max_uses = page_max_uses
+        self.listing_pool: Optional[PagePool] = None
+        self.detail_pool: Optional[PagePool] = None
+        self._browser_lock = asyncio.Lock()
+        # Browser pages are waited on for readiness instead of fixed sleeps
+        self.waiter = ReadinessWaiter()
+        self.resource_blocker = ResourceBlocker(self.RESOURCE_ALLOWLIST) if block_resources else None
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        
+        # Scraped products are streamed to the checkpoint instead of being kept in memory
+        if checkpoint_compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown checkpoint compression: {checkpoint_compression}")
+        if checkpoint_compression == 'zstd' and not ZSTD_AVAILABLE:
+            raise ValueError("zstd checkpoint compression needs the zstandard package (pip install zstandard)")
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_compression = checkpoint_compression
+        self.checkpoint: Optional[JsonlWriter] = None
         
-        # Use a temporary directory for images
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.images_dir = Path(self.temp_dir.name)
-        logger.info(f"Temporary images directory created at: {self.images_dir}")
+        # Persistent crawl frontier, opened when scraping starts
+        self.state_path = state_path
+        self.resume = resume
+        self.frontier: Optional[CrawlFrontier] = None
         
         # Initialize PocketBase
         load_dotenv()
         logger.info("Environment variables loaded")
         logger.info(f"PocketBase URL: {os.getenv('NEXT_PUBLIC_POCKETBASE_URL')}")
+        pocketbase_url = os.getenv('NEXT_PUBLIC_POCKETBASE_URL', 'http://127.0.0.1:8090')
+        
+        # Every host gets an adaptive request rate and a circuit breaker; our own PocketBase may go faster
+        self.rate_limiter = RateLimiter(
+            initial_rate=request_rate,
+            # Backing off never speeds up a shard whose share of the rate is below the default minimum
+            min_rate=min(0.5, request_rate),
+            max_rate=max(request_rate, max_request_rate),
+            overrides={urlparse(pocketbase_url).hostname or pocketbase_url: {'initial_rate': 20.0, 'max_rate': 100.0}}
+        )
         
-        self.pb_client = PocketBase(os.getenv('NEXT_PUBLIC_POCKETBASE_URL', 'http://127.0.0.1:8090'))
+        # All PocketBase calls share this non-blocking pooled client; it authenticates when scraping starts
+        self.pb = AsyncPocketBase(
+            pocketbase_url,
+            concurrency=concurrency * 2,
+            rate_limiter=self.rate_limiter
+        )
         logger.info("PocketBase client initialized")
         
-        self.authenticate_pocketbase()
-        logger.info("PocketBase authentication completed")
+        # Product creates and updates are buffered and written in batches
+        # Products whose images are still to be uploaded are bounded, which bounds the image buffers held
+        self.product_writer = UpsertWriter(
+            self.pb,
+            'products',
+            batch_size=batch_size,
+            dead_letter_path=dead_letter_path,
+            max_pending=max(batch_size, self.concurrency * 4)
+        )
         
         # Cache for category ID
         self._category_id = None
 
-    def __del__(self):
-        """Clean up temporary directory when the scraper object is destroyed."""
-        if hasattr(self, 'temp_dir'):
-            self.temp_dir.cleanup()
-            logger.info("Temporary images directory cleaned up")
-
-    def authenticate_pocketbase(self) -> None:
+    async def authenticate_pocketbase(self) -> None:
         """Authenticate with PocketBase."""
         try:
             email = os.getenv('POCKETBASE_ADMIN_EMAIL')
@@ -86,7 +297,7 @@ class SkytechScraper:
             
             logger.info(f"Attempting to authenticate with email: {email}")
             
-            self.pb_client.admins.auth_with_password(email, password)
+            await self.pb.auth_with_password(email, password)
             logger.info("Successfully authenticated with PocketBase")
         except Exception as e:
             logger.error(f"Failed to authenticate with PocketBase: {str(e)}")
@@ -96,10 +307,10 @@ class SkytechScraper:
         """Initialize the browser."""
         try:
             logger.info("Starting Playwright initialization")
-            playwright = await async_playwright().start()
+            self.playwright = await async_playwright().start()
             logger.info("Playwright started")
             
-            self.browser = await playwright.chromium.launch(
+            self.browser = await self.playwright.chromium.launch(
                 headless=True,
                 args=['--disable-dev-shm-usage']  # Helps with memory issues
             )
@@ -125,23 +336,127 @@ class SkytechScraper:
             """)
             logger.info("Browser anti-detection script added")
             
-            self.page = await self.context.new_page()
-            logger.info("New page created")
+            # Only the HTML is read, so skip the subresources
+            if self.resource_blocker:
+                await self.resource_blocker.install(self.context)
             
-            if not self.page:
-                raise RuntimeError("Failed to create new page")
+            # Page pools, one page per concurrent listing fetch and per product worker
+            self.listing_pool = PagePool(
+                self.context,
+                self.listing_concurrency,
+                name='listing',
+                max_uses=self.page_max_uses,
+                default_timeout=60000
+            )
+            self.detail_pool = PagePool(
+                self.context,
+                self.concurrency,
+                name='detail',
+                max_uses=self.page_max_uses,
+                default_timeout=30000  # 30 second timeout for product pages
+            )
+            logger.info(f"Created page pools for {self.listing_concurrency} listing and {self.concurrency} product pages")
             
-            # Set default timeout to 60 seconds
-            self.page.set_default_timeout(60000)
             logger.info("Browser initialization completed successfully")
             
         except Exception as e:
             logger.error(f"Failed to initialize browser: {str(e)}")
             raise
 
+    async def ensure_browser(self) -> None:
+        """Start the browser on first use, e.g. when an HTTP-mode page needs JavaScript."""
+        async with self._browser_lock:
+            if not self.browser:
+                await self.init_browser()
+
+    async def init_http_session(self) -> None:
+        """Create the pooled HTTP session used for pages in the browserless mode and for images."""
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency * 4,
+            limit_per_host=self.concurrency * 2,
+            ttl_dns_cache=300
+        )
+        self.http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=ClientTimeout(total=30),
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'lt-LT,lt;q=0.9,en;q=0.8'
+            }
+        )
+        logger.info(f"HTTP session created with a pool of {self.concurrency * 4} connections")
+
+    async def close_http_session(self) -> None:
+        """Close the pooled HTTP session."""
+        if self.http_session:
+            try:
+                await self.http_session.close()
+                logger.info("HTTP session closed successfully")
+            except Exception as e:
+                logger.warning(f"Error closing HTTP session: {e}")
+            self.http_session = None
+
+    async def fetch_html(self, url: str) -> Optional[str]:
+        """Fetch a page over HTTP, returning None if it could not be loaded.
+
+        Requests are paced by the rate limiter, which also spaces out the retries. Raises
+        ``CircuitOpenError`` when the host's circuit is open, so callers fail fast instead of
+        falling back to the browser.
+        """
+        if not self.http_session:
+            logger.error("HTTP session not initialized")
+            return None
+        
+        max_retries = 3
+        for attempt in range(max_retries):
+            await self.rate_limiter.acquire(url)
+            started = time.monotonic()
+            try:
+                async with self.http_session.get(url) as response:
+                    if response.status == 200:
+                        html = await response.text(errors='replace')
+                        self.rate_limiter.record(url, response.status, time.monotonic() - started)
+                        return html
+                    self.rate_limiter.record(
+                        url, response.status, time.monotonic() - started,
+                        retry_after=response.headers.get('Retry-After')
+                    )
+                    logger.warning(f"Failed to fetch {url}. Status: {response.status}")
+                    if response.status != 429 and response.status < 500:
+                        return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.rate_limiter.record(url, error=True)
+                logger.warning(f"Retry {attempt + 1}/{max_retries} fetching {url}: {e}")
+        return None
+
+    async def goto(self, page: Page, url: str, timeout: int = 30000) -> None:
+        """Navigate a browser page through the rate limiter.
+
+        Raises on navigation errors and on 429/5xx responses, so callers can retry; the limiter
+        spaces out the retries.
+        """
+        await self.rate_limiter.acquire(url)
+        started = time.monotonic()
+        try:
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+        except Exception:
+            self.rate_limiter.record(url, error=True)
+            raise
+        
+        status = response.status if response else None
+        retry_after = response.headers.get('retry-after') if response else None
+        self.rate_limiter.record(url, status, time.monotonic() - started, retry_after=retry_after)
+        if status is not None and (status == 429 or status >= 500):
+            raise Exception(f"Status {status} loading {url}")
+
     async def close_browser(self) -> None:
         """Close browser and all pages."""
         try:
+            for pool in (self.listing_pool, self.detail_pool):
+                if pool:
+                    await pool.close()
+            
             if self.context:
                 try:
                     await self.context.close()
@@ -157,22 +472,16 @@ class SkytechScraper:
                 except Exception as e:
                     logger.warning(f"Error closing browser: {e}")
                     # Browser might already be closed, which is fine
+            
+            if self.playwright:
+                try:
+                    await self.playwright.stop()
+                except Exception as e:
+                    logger.warning(f"Error stopping Playwright: {e}")
         except Exception as e:
             logger.warning(f"Error during browser cleanup: {e}")
             # Don't raise the exception as it's just cleanup
 
-    async def safe_wait_for_selector(self, selector: str, timeout: int = 10000) -> Optional[ElementHandle]:
-        """Safely wait for and return an element."""
-        if not self.page:
-            logger.error("Page not initialized")
-            return None
-            
-        try:
-            return await self.page.wait_for_selector(selector, timeout=timeout)
-        except Exception as e:
-            logger.warning(f"Timeout waiting for selector {selector}: {e}")
-            return None
-
     def generate_slug(self, name: str) -> str:
         """Generate a URL-friendly slug from the product name."""
         # Convert to lowercase and replace spaces with hyphens
@@ -193,16 +502,15 @@ class SkytechScraper:
 
         try:
             # Try to find existing category with proper filter syntax
-            result = self.pb_client.collection('categories').get_list(
-                query_params={
-                    'filter': f'name_lt = "{self.category_name_lt}"',
-                    'page': 1,
-                    'perPage': 1
-                }
+            result = await self.pb.get_list(
+                'categories',
+                1,
+                1,
+                {'filter': f'name_lt = "{self.category_name_lt}"', 'skipTotal': 1}
             )
 
-            if result.items:
-                self._category_id = result.items[0].id
+            if result['items']:
+                self._category_id = result['items'][0]['id']
                 logger.info(f"Found existing category with ID: {self._category_id}")
             else:
                 # Create new category with required fields
@@ -216,8 +524,8 @@ class SkytechScraper:
                     'updated': datetime.now().isoformat()
                 }
                 try:
-                    result = self.pb_client.collection('categories').create(category_data)
-                    self._category_id = result.id
+                    result = await self.pb.create('categories', category_data)
+                    self._category_id = result['id']
                     logger.info(f"Created new category with ID: {self._category_id}")
                 except Exception as create_error:
                     logger.error(f"Failed to create category: {str(create_error)}")
@@ -230,206 +538,350 @@ class SkytechScraper:
             raise
 
     async def stream_all_images_to_pocketbase(self, product_id: str, image_urls: List[str], product_name: str) -> bool:
-        """Stream multiple images to PocketBase, setting the first as the thumbnail and uploading each additional image separately."""
+        """Download a product's images in parallel and upload them to PocketBase in one request.
+
+        The first downloaded image becomes the thumbnail and the rest go to the gallery. Each image
+        is streamed into a bounded buffer (see ``_download_image``) and the buffers are streamed
+        into a single multipart PATCH, so the record is rewritten once. With an image cache the
+        upload is skipped when the record already has exactly these images.
+        """
         if not image_urls:
             logger.warning(f"No images to upload for product: {product_name}")
             return False
         
+        if not self.http_session:
+            logger.error("HTTP session not initialized")
+            return False
+        
+        images: List[Tuple[str, IO[bytes], str, str]] = []
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-            }
+            downloads = await asyncio.gather(*(
+                self._download_image(img_url, i, len(image_urls), product_name)
+                for i, img_url in enumerate(image_urls)
+            ))
+            images = [image for image in downloads if image]
             
-            # Track successful uploads
-            successful_uploads = 0
-            thumbnail_uploaded = False
-
-            # Build a list of all file paths to upload at the end
-            thumbnail_file = None
-            gallery_files = []
+            if not images:
+                logger.warning(f"Failed to upload thumbnail image for {product_name}")
+                return False
             
-            # Process each image individually
-            async with aiohttp.ClientSession() as session:
-                for i, img_url in enumerate(image_urls):
-                    try:
-                        logger.info(f"Processing image {i+1}/{len(image_urls)} for {product_name}")
-                        
-                        # Download the image - using proper ClientTimeout object
-                        async with session.get(img_url, headers=headers, timeout=ClientTimeout(total=30)) as response:
-                            if response.status != 200:
-                                logger.warning(f"Failed to download image {i+1}/{len(image_urls)} for {product_name}. Status: {response.status}")
-                                continue
-                                
-                            # Verify content type
-                            content_type = response.headers.get('content-type', '')
-                            if not content_type.startswith('image/'):
-                                logger.warning(f"Invalid content type for {product_name} image {i+1}: {content_type}")
-                                continue
-                                
-                            # Determine file extension based on content type
-                            ext = content_type.split('/')[-1].lower()
-                            if ext == 'jpeg':
-                                ext = 'jpg'
-                            elif ext not in ['jpg', 'png', 'webp']:
-                                ext = 'webp'  # Default to webp
-                            
-                            # Generate a safe filename with index
-                            safe_name = self.generate_slug(product_name)
-                            filename = f"{safe_name}-{i+1}.{ext}"
-                            
-                            # Read image data into memory
-                            image_data = await response.read()
-                            
-                            # Save image to temporary file
-                            temp_file_path = os.path.join(self.images_dir, filename)
-                            with open(temp_file_path, 'wb') as f:
-                                f.write(image_data)
-                            
-                            # Store file paths for later upload
-                            if i == 0:
-                                thumbnail_file = temp_file_path
-                            else:
-                                gallery_files.append(temp_file_path)
-                                
-                    except aiohttp.ClientError as e:
-                        logger.error(f"Connection error downloading image {i+1} for {product_name}: {e}")
-                        continue
-                    except Exception as e:
-                        logger.error(f"Unexpected error processing image {i+1} for {product_name}: {e}")
-                        continue
+            digests = [digest for _, _, _, digest in images]
+            if self.image_cache and not self.full_sync and self.image_cache.uploaded_digests(product_id) == digests:
+                logger.info(f"Product {product_id} already has these {len(images)} images, skipping upload")
+                return True
             
-            # Now upload the thumbnail first
-            if thumbnail_file:
-                try:
-                    # Use requests directly for more reliable multipart upload
-                    pb_url = os.getenv('NEXT_PUBLIC_POCKETBASE_URL', 'http://127.0.0.1:8090')
-                    endpoint = f"{pb_url}/api/collections/products/records/{product_id}"
-                    
-                    # Get the auth token from PocketBase client
-                    auth_token = self.pb_client.auth_store.token
-                    
-                    # Get file extension for MIME type
-                    file_ext = os.path.splitext(thumbnail_file)[1][1:].lower()
-                    if not file_ext or file_ext not in ['jpg', 'jpeg', 'png', 'webp', 'gif']:
-                        file_ext = 'jpeg'  # Default to jpeg if extension is missing or invalid
-                    
-                    mime_type = f'image/{file_ext}'
-                    # Convert jpg to jpeg for MIME type (standard)
-                    if file_ext == 'jpg':
-                        mime_type = 'image/jpeg'
+            response_data = await self._upload_product_images(product_id, images, product_name)
+            if response_data is None:
+                return False
+            
+            if self.image_cache:
+                gallery = response_data.get('images') or []
+                file_names = [response_data.get('image')] + (gallery[-(len(images) - 1):] if len(images) > 1 else [])
+                self.image_cache.record_uploads(product_id, digests, file_names)
+            
+            logger.info(f"Successfully uploaded {len(images)} images for product {product_id} ({len(images)}/{len(image_urls)} succeeded)")
+            return True
+                
+        except Exception as e:
+            logger.error(f"Error in image upload process for {product_name}: {e}")
+            return False
+        finally:
+            for _, buffer, _, _ in images:
+                buffer.close()
+
+    def _image_file_name(self, product_name: str, index: int, content_type: str) -> Tuple[str, str]:
+        """Build the upload file name and MIME type of a product image from its content type."""
+        # Determine file extension based on content type
+        ext = content_type.split('/')[-1].split(';')[0].lower()
+        if ext == 'jpeg':
+            ext = 'jpg'
+        elif ext not in ['jpg', 'png', 'webp']:
+            ext = 'webp'  # Default to webp
+        
+        # Generate a safe filename with index
+        safe_name = self.generate_slug(product_name)
+        mime_type = 'image/jpeg' if ext == 'jpg' else f'image/{ext}'
+        return f"{safe_name}-{index+1}.{ext}", mime_type
+
+    async def _download_image(self, img_url: str, index: int, total: int, product_name: str) -> Optional[Tuple[str, IO[bytes], str, str]]:
+        """Stream one product image into a buffer and return its file name, buffer, MIME type and SHA-256 digest.
+
+        Without an image cache the buffer stays in memory up to ``image_buffer_bytes`` and then
+        spills to a temporary file, or the image is skipped if spilling is disabled. With a cache
+        the image is written to (or served from) the cache, revalidating stale entries with
+        ETag/Last-Modified.
+        """
+        if not self.http_session:
+            return None
+        
+        headers = {
+            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+            'Accept-Encoding': 'gzip, deflate, br',
+        }
+        
+        cached = self.image_cache.lookup(img_url) if self.image_cache else None
+        if cached and self.image_cache:
+            if self.image_cache.is_fresh(cached):
+                logger.info(f"Using cached image {index+1}/{total} for {product_name}")
+                filename, mime_type = self._image_file_name(product_name, index, cached['content_type'] or '')
+                return filename, self.image_cache.open(cached['digest']), mime_type, cached['digest']
+            headers.update(self.image_cache.revalidation_headers(cached))
+        
+        try:
+            async with self.image_download_semaphore:
+                logger.info(f"Processing image {index+1}/{total} for {product_name}")
+                
+                await self.rate_limiter.acquire(img_url)
+                started = time.monotonic()
+                async with self.http_session.get(img_url, headers=headers, timeout=ClientTimeout(total=30)) as response:
+                    self.rate_limiter.record(
+                        img_url, response.status, time.monotonic() - started,
+                        retry_after=response.headers.get('Retry-After')
+                    )
+                    if response.status == 304 and cached and self.image_cache:
+                        logger.info(f"Cached image {index+1}/{total} for {product_name} is still valid")
+                        self.image_cache.mark_revalidated(img_url)
+                        filename, mime_type = self._image_file_name(product_name, index, cached['content_type'] or '')
+                        return filename, self.image_cache.open(cached['digest']), mime_type, cached['digest']
                     
-                    # Upload thumbnail
-                    with open(thumbnail_file, 'rb') as file:
-                        files = {'image': (os.path.basename(thumbnail_file), file, mime_type)}
-                        headers = {'Authorization': f"Bearer {auth_token}"}
+                    if response.status != 200:
+                        logger.warning(f"Failed to download image {index+1}/{total} for {product_name}. Status: {response.status}")
+                        return None
                         
-                        response = requests.patch(endpoint, files=files, headers=headers)
+                    # Verify content type
+                    content_type = response.headers.get('content-type', '')
+                    if not content_type.startswith('image/'):
+                        logger.warning(f"Invalid content type for {product_name} image {index+1}: {content_type}")
+                        return None
                         
-                        if response.status_code == 200:
-                            logger.info(f"Successfully uploaded thumbnail image for product {product_id}")
-                            thumbnail_uploaded = True
-                            successful_uploads += 1
-                            
-                            # Verify the image field is actually set in the response
-                            response_data = response.json()
-                            if not response_data.get('image'):
-                                logger.warning(f"Thumbnail upload succeeded but image field is empty in response for {product_id}")
-                            else:
-                                logger.info(f"Verified thumbnail image was saved with URL: {response_data.get('image')}")
-                        else:
-                            logger.error(f"Failed to upload thumbnail image. Status: {response.status_code}, Response: {response.text}")
-                except Exception as e:
-                    logger.error(f"Error uploading thumbnail for {product_name}: {e}")
-                finally:
-                    # Clean up thumbnail file
-                    try:
-                        if os.path.exists(thumbnail_file):
-                            os.remove(thumbnail_file)
-                    except Exception as e:
-                        logger.warning(f"Could not remove temporary file {thumbnail_file}: {e}")
-            
-            # Then upload each gallery image
-            for idx, gallery_file in enumerate(gallery_files):
-                try:
-                    # Use requests for reliable multipart upload
-                    pb_url = os.getenv('NEXT_PUBLIC_POCKETBASE_URL', 'http://127.0.0.1:8090')
-                    endpoint = f"{pb_url}/api/collections/products/records/{product_id}"
+                    filename, mime_type = self._image_file_name(product_name, index, content_type)
                     
-                    # Get the auth token
-                    auth_token = self.pb_client.auth_store.token
-                    
-                    # Get file extension for MIME type
-                    file_ext = os.path.splitext(gallery_file)[1][1:].lower()
-                    if not file_ext or file_ext not in ['jpg', 'jpeg', 'png', 'webp', 'gif']:
-                        file_ext = 'jpeg'  # Default to jpeg if extension is missing or invalid
+                    if self.image_cache:
+                        writer = self.image_cache.writer(
+                            img_url,
+                            content_type,
+                            response.headers.get('ETag'),
+                            response.headers.get('Last-Modified')
+                        )
+                        try:
+                            async for chunk in response.content.iter_chunked(64 * 1024):
+                                writer.write(chunk)
+                        except BaseException:
+                            writer.abort()
+                            raise
+                        digest = writer.commit()
+                        return filename, self.image_cache.open(digest), mime_type, digest
                     
-                    mime_type = f'image/{file_ext}'
-                    # Convert jpg to jpeg for MIME type (standard)
-                    if file_ext == 'jpg':
-                        mime_type = 'image/jpeg'
+                    if not self.image_spill and (response.content_length or 0) > self.image_buffer_bytes:
+                        logger.warning(f"Skipping image {index+1} for {product_name}: {response.content_length} bytes exceeds the buffer")
+                        return None
                     
-                    # Upload gallery image
-                    with open(gallery_file, 'rb') as file:
-                        # IMPORTANT: For PocketBase's field 'images' which is array type,
-                        # the field name for form data should be 'images' not 'images[]'
-                        files = {'images': (os.path.basename(gallery_file), file, mime_type)}
-                        headers = {'Authorization': f"Bearer {auth_token}"}
-                        
-                        response = requests.patch(endpoint, files=files, headers=headers)
-                        
-                        if response.status_code == 200:
-                            logger.info(f"Successfully uploaded gallery image {idx+1} for product {product_id}")
-                            successful_uploads += 1
-                            
-                            # Verify the images field is populated
-                            response_data = response.json()
-                            if not response_data.get('images') or len(response_data.get('images', [])) == 0:
-                                logger.warning(f"Gallery image upload succeeded but images field is empty in response for {product_id}")
-                            else:
-                                # Log images array size
-                                images_count = len(response_data.get('images', []))
-                                logger.info(f"Verified gallery images were saved. Product now has {images_count} images in gallery.")
-                        else:
-                            logger.error(f"Failed to upload gallery image {idx+1}. Status: {response.status_code}, Response: {response.text}")
-                except Exception as e:
-                    logger.error(f"Error uploading gallery image {idx+1} for {product_name}: {e}")
-                finally:
-                    # Clean up gallery file
+                    # Spooled buffers stay in memory until they exceed the threshold
+                    buffer = tempfile.SpooledTemporaryFile(max_size=self.image_buffer_bytes)
+                    image_hash = hashlib.sha256()
+                    size = 0
                     try:
-                        if os.path.exists(gallery_file):
-                            os.remove(gallery_file)
-                    except Exception as e:
-                        logger.warning(f"Could not remove temporary file {gallery_file}: {e}")
+                        async for chunk in response.content.iter_chunked(64 * 1024):
+                            size += len(chunk)
+                            if not self.image_spill and size > self.image_buffer_bytes:
+                                logger.warning(f"Skipping image {index+1} for {product_name}: larger than the {self.image_buffer_bytes} byte buffer")
+                                buffer.close()
+                                return None
+                            buffer.write(chunk)
+                            image_hash.update(chunk)
+                    except BaseException:
+                        buffer.close()
+                        raise
+                    
+                    buffer.seek(0)
+                    return filename, buffer, mime_type, image_hash.hexdigest()
                 
-                # Add a small delay between uploads
-                await asyncio.sleep(0.5)
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping image {index+1} for {product_name}: {e}")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.rate_limiter.record(img_url, error=True)
+            logger.error(f"Connection error downloading image {index+1} for {product_name}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error processing image {index+1} for {product_name}: {e}")
+            return None
+
+    async def _upload_product_images(self, product_id: str, images: List[Tuple[str, IO[bytes], str, str]], product_name: str) -> Optional[Dict[str, Any]]:
+        """Upload the thumbnail and the gallery of a product with a single multipart PATCH.
+
+        Returns the updated record data, or None if the upload failed.
+        """
+        try:
+            # IMPORTANT: For PocketBase's field 'images' which is array type,
+            # the field name for form data should be 'images' not 'images[]'
+            files = [
+                ('image' if i == 0 else 'images', filename, buffer, mime_type)
+                for i, (filename, buffer, mime_type, _) in enumerate(images)
+            ]
             
-            # Report results
-            if thumbnail_uploaded:
-                logger.info(f"Successfully uploaded {successful_uploads} images for product {product_id} ({successful_uploads}/{len(image_urls)} succeeded)")
-                return True
+            async with self.image_upload_semaphore:
+                try:
+                    response_data = await self.pb.update('products', product_id, files=files)
+                except ClientResponseError as e:
+                    logger.error(f"Failed to upload images. Status: {e.status}, Response: {e.data}")
+                    return None
+            
+            # Verify the fields are actually set in the response
+            if not response_data.get('image'):
+                logger.warning(f"Image upload succeeded but image field is empty in response for {product_id}")
             else:
-                logger.warning(f"Failed to upload thumbnail image for {product_name}")
-                return False
+                logger.info(f"Verified thumbnail image was saved with URL: {response_data.get('image')}")
+            
+            if len(images) > 1:
+                images_count = len(response_data.get('images') or [])
+                if images_count == 0:
+                    logger.warning(f"Gallery image upload succeeded but images field is empty in response for {product_id}")
+                else:
+                    logger.info(f"Verified gallery images were saved. Product now has {images_count} images in gallery.")
+            return response_data
                 
         except Exception as e:
-            logger.error(f"Error in image upload process for {product_name}: {e}")
+            logger.error(f"Error uploading images for {product_name}: {e}")
+            return None
+
+    def parse_listing_row(self, product_row: Any) -> Optional[Dict[str, Any]]:
+        """Read the raw listing fields from a product row parsed with BeautifulSoup."""
+        name_cell = product_row.select_one('td.name a')
+        if not name_cell:
+            logger.warning("Could not find product name element")
+            return None
+        
+        img_element = product_row.select_one('td.image img')
+        price_element = product_row.select_one('td strong')
+        stock_element = product_row.select_one('td.kiekis')
+        
+        return {
+            'href': name_cell.get('href'),
+            'name': name_cell.get_text(),
+            'image_src': img_element.get('src') if img_element else None,
+            'price_text': price_element.get_text() if price_element else None,
+            'stock_text': stock_element.get_text() if stock_element else None,
+            'stock_class': ' '.join(stock_element.get('class', [])) if stock_element else None
+        }
+
+    def parse_listing_name(self, name_text: str) -> Tuple[str, str]:
+        """Split a listing name into the product name and the model."""
+        model = ""
+        name = name_text.strip()
+        
+        # Try to extract model from the name
+        if "MODELIS:" in name:
+            parts = name.split("MODELIS:", 1)
+            if len(parts) > 1:
+                model = parts[1].strip().split(" ", 1)[0].strip()
+                if len(parts[1].split(" ", 1)) > 1:
+                    name = parts[1].split(" ", 1)[1].strip()
+        
+        return name, model
+
+    def parse_listing_price(self, listing: Dict[str, Any]) -> float:
+        """Parse the price of a listing row."""
+        price_text = listing.get('price_text') or "0"
+        
+        try:
+            # Parse price, removing the currency symbol and converting to float
+            return float(price_text.replace('€', '').replace(' ', '').replace(',', '.').strip())
+        except (ValueError, AttributeError):
+            logger.warning(f"Error parsing price: {price_text}")
+            return 0.0
+
+    def parse_listing_stock(self, listing: Dict[str, Any]) -> int:
+        """Parse the stock of a listing row."""
+        stock_text = listing.get('stock_text') or "0"
+        class_attr = listing.get('stock_class')
+        
+        stock = 0
+        if stock_text:
+            if '5+' in stock_text:
+                stock = 5  # Set to 5 for "5+" stock
+            elif class_attr and 'date' in class_attr:
+                # This is a date, not a stock number
+                stock = 0
+            else:
+                # Try to extract a number
+                try:
+                    stock_match = re.search(r'\d+', stock_text)
+                    if stock_match:
+                        stock = int(stock_match.group(0))
+                except (ValueError, AttributeError):
+                    logger.warning(f"Error parsing stock: {stock_text}")
+                    stock = 0
+        return stock
+
+    def _fingerprint_part(self, value: Any) -> str:
+        """Hash a JSON-serializable value into one fingerprint part."""
+        serialized = json.dumps(value, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:16]
+
+    def product_fingerprint(self, price: float, stock: int, specs: Dict[str, str], image_urls: List[str]) -> str:
+        """Build the sync fingerprint stored with each product.
+
+        The fingerprint has three dot-separated parts (price and stock, specifications, image URLs),
+        so the listing part can be checked before the product page is fetched and the images part
+        before the images are uploaded again.
+        """
+        return '.'.join([
+            self._fingerprint_part([price, stock]),
+            self._fingerprint_part(specs),
+            self._fingerprint_part(image_urls)
+        ])
+
+    def is_listing_unchanged(self, listing: Dict[str, Any], existing_product: Dict[str, Any]) -> bool:
+        """Check whether a listing row still matches the price and stock stored with the product.
+
+        A stored fingerprint with an empty images part means the last image upload did not finish,
+        so the product is never treated as unchanged then.
+        """
+        stored_parts = (existing_product.get('fingerprint') or '').split('.')
+        if len(stored_parts) != 3 or not stored_parts[-1]:
             return False
+        listing_part = self._fingerprint_part([self.parse_listing_price(listing), self.parse_listing_stock(listing)])
+        return stored_parts[0] == listing_part
+
+    async def load_existing_products(self, per_page: int = 500) -> None:
+        """Load all stored skytech products into the URL and slug indexes with paged bulk reads."""
+        self.existing_by_url = {}
+        self.existing_by_slug = {}
+        
+        async for product in self.pb.iterate(
+            'products',
+            per_page,
+            {
+                'filter': 'source = "skytech"',
+                'fields': 'id,url,slug,fingerprint,image'
+            }
+        ):
+            self._index_existing_product(product)
+        
+        logger.info(f"Loaded {len(self.existing_by_url)} existing skytech products")
 
-    async def extract_product_data(self, product_element: ElementHandle) -> Optional[Dict[str, Any]]:
-        """Extract product data from a product row."""
+    def _index_existing_product(self, product: Dict[str, Any]) -> None:
+        """Add a stored product record to the URL index, or to the slug index if it has no URL."""
+        if product.get('url'):
+            self.existing_by_url[product['url']] = product
+        elif product.get('slug'):
+            # Slugs are not unique, so they only identify records saved without a URL
+            self.existing_by_slug[product['slug']] = product
+
+    def find_existing_product(self, product_url: str, slug: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Find the stored skytech product by URL, falling back to the slug of records without a URL."""
+        existing_product = self.existing_by_url.get(product_url)
+        if existing_product is None and slug:
+            # The first product claims the record; saving it gives the record this URL
+            existing_product = self.existing_by_slug.pop(slug, None)
+        return existing_product
+
+    async def extract_product_data(self, listing: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build product data from a listing row and its product page."""
         try:
-            # Get product link (which contains the name and URL)
-            name_cell = await product_element.query_selector('td.name a')
-            if not name_cell:
-                logger.warning("Could not find product name element")
-                return None
-                
             # Get product URL
-            product_url = await name_cell.get_attribute('href')
+            product_url = listing.get('href')
             if not product_url:
                 logger.warning("Could not find product URL")
                 return None
@@ -438,84 +890,31 @@ class SkytechScraper:
             product_url = urljoin(self.base_url, product_url)
             
             # Get product name
-            name_text = await name_cell.text_content()
+            name_text = listing.get('name')
             if not name_text:
                 logger.warning("Could not find product name text")
                 return None
                 
             # Split the name into model and product name
-            model = ""
-            name = name_text.strip()
-            
-            # Try to extract model from the name
-            if "MODELIS:" in name:
-                parts = name.split("MODELIS:", 1)
-                if len(parts) > 1:
-                    model = parts[1].strip().split(" ", 1)[0].strip()
-                    if len(parts[1].split(" ", 1)) > 1:
-                        name = parts[1].split(" ", 1)[1].strip()
+            name, model = self.parse_listing_name(name_text)
             
             # Get product image
-            img_element = await product_element.query_selector('td.image img')
             image_url = ""
-            if img_element:
-                image_src = await img_element.get_attribute('src')
-                if image_src:
-                    image_url = urljoin(self.base_url, image_src)
+            if listing.get('image_src'):
+                image_url = urljoin(self.base_url, listing['image_src'])
             
-            # Get product price
-            price_element = await product_element.query_selector('td strong')
-            price_text = await price_element.text_content() if price_element else "0"
+            # Get product price and stock information
+            price = self.parse_listing_price(listing)
+            stock = self.parse_listing_stock(listing)
             
-            try:
-                # Parse price, removing the currency symbol and converting to float
-                price = float(price_text.replace('€', '').replace(' ', '').replace(',', '.').strip())
-            except (ValueError, AttributeError):
-                logger.warning(f"Error parsing price: {price_text}")
-                price = 0.0
-                
-            # Get stock information
-            stock_element = await product_element.query_selector('td.kiekis')
-            stock_text = await stock_element.text_content() if stock_element else "0"
-            
-            # Parse stock information
-            stock = 0
-            if stock_text:
-                if '5+' in stock_text:
-                    stock = 5  # Set to 5 for "5+" stock
-                elif stock_element:
-                    class_attr = await stock_element.get_attribute('class')
-                    if class_attr and 'date' in class_attr:
-                        # This is a date, not a stock number
-                        stock = 0
-                    else:
-                        # Try to extract a number
-                        try:
-                            stock_match = re.search(r'\d+', stock_text)
-                            if stock_match:
-                                stock = int(stock_match.group(0))
-                        except (ValueError, AttributeError):
-                            logger.warning(f"Error parsing stock: {stock_text}")
-                            stock = 0
-                else:
-                    # Try to extract a number
-                    try:
-                        stock_match = re.search(r'\d+', stock_text)
-                        if stock_match:
-                            stock = int(stock_match.group(0))
-                    except (ValueError, AttributeError):
-                        logger.warning(f"Error parsing stock: {stock_text}")
-                        stock = 0
-            
-            # Get detailed specifications from the product page
-            specs = await self.get_product_specifications(product_url)
+            # Get specifications and full-size images with a single product page visit
+            details = await self.get_product_details(product_url)
+            specs = details['specifications']
+            image_urls = details['image_urls']
             
             # Try to extract model from specifications if not found in name
-            if not model and 'Modelis' in specs:
-                model = specs['Modelis']
-            
-            # Get full-size product images from the product page
-            image_urls = await self.get_product_images(product_url)
+            if not model and details['model']:
+                model = details['model']
             
             # If no image URLs were found from the detail page, use the thumbnail
             if not image_urls and image_url:
@@ -529,6 +928,7 @@ class SkytechScraper:
             
             # Create the product data dictionary
             product_data = {
+                'fingerprint': self.product_fingerprint(price, stock, specs, image_urls),
                 'name': name.strip(),
                 'model': model.strip(),
                 'slug': slug,
@@ -550,191 +950,153 @@ class SkytechScraper:
             logger.error(f"Error extracting product data: {e}")
             return None
 
-    async def get_product_specifications(self, product_url: str) -> Dict[str, str]:
-        """Get detailed specifications from the product page."""
-        specs = {}
-        product_page = None
+    async def get_product_details(self, product_url: str) -> Dict[str, Any]:
+        """Load the product page once and extract its specifications and images.
+
+        Returns a dict with ``specifications``, ``model``, ``brand``, ``price`` and ``image_urls``.
+        In HTTP mode the page is fetched and parsed without the browser when possible, and the
+        browser is only used when the fetched HTML lacks the product blocks; a failed fetch raises.
+        """
+        if self.mode == 'http':
+            html = await self.fetch_html(product_url)
+            if html is None:
+                # Only pages that need JavaScript go to the browser; failed fetches fail the product
+                raise Exception(f"Could not fetch product page: {product_url}")
+            details = self.parse_product_html(html)
+            if details is not None:
+                return details
+            logger.info(f"Product page needs the browser, falling back to Playwright: {product_url}")
+            await self.ensure_browser()
         
-        if not self.context:
+        return await self._get_product_details_browser(product_url)
+
+    async def _get_product_details_browser(self, product_url: str) -> Dict[str, Any]:
+        """Load the product page once in a pooled browser page and extract its specifications and images."""
+        details: Dict[str, Any] = {
+            'specifications': {},
+            'model': '',
+            'brand': '',
+            'price': '',
+            'image_urls': []
+        }
+        if not self.detail_pool:
             logger.error("Browser context not initialized")
-            return specs
+            return details
             
         try:
-            # Open new page for product details
-            product_page = await self.context.new_page()
-            if not product_page:
-                logger.error("Failed to create new page")
-                return specs
-
-            # Set timeout for the page
-            product_page.set_default_timeout(30000)  # 30 second timeout for product pages
-            
-            # Navigate with retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    await product_page.goto(
-                        product_url,
-                        wait_until='domcontentloaded',
-                        timeout=30000
-                    )
-                    break
-                except Exception as e:
-                    if attempt == max_retries - 1:
+            async with self.detail_pool.lease() as product_page:
+                # Navigate with retry logic
+                max_retries = 3
+                for attempt in range(max_retries):
+                    try:
+                        await self.goto(product_page, product_url, timeout=30000)
+                        break
+                    except CircuitOpenError:
                         raise
-                    logger.warning(f"Retry {attempt + 1}/{max_retries} loading {product_url}: {e}")
-                    await asyncio.sleep(2)
-            
-            # Try different approaches to extract specifications
+                    except Exception as e:
+                        if attempt == max_retries - 1:
+                            raise
+                        logger.warning(f"Retry {attempt + 1}/{max_retries} loading {product_url}: {e}")
+                
+                # Read everything from the loaded DOM in a single round-trip
+                payload = await product_page.evaluate(PRODUCT_PAGE_SCRIPT)
+                if payload['description_tab_clicked'] and not ((payload['description'] or {}).get('text') or '').strip():
+                    # Wait for the tab content to be rendered
+                    await self.waiter.for_function(
+                        product_page,
+                        DESCRIPTION_READY_SCRIPT,
+                        'description_tab',
+                        replaced_sleep=1.0
+                    )
+                    payload = await product_page.evaluate(PRODUCT_PAGE_SCRIPT)
             
+            return self._details_from_payload(payload)
+
+        except CircuitOpenError:
+            # Fail the product instead of saving it without details
+            raise
+        except Exception as e:
+            logger.error(f"Error getting product details: {e}")
+            return details
+
+    def _details_from_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a raw product page payload into specifications, model, brand, price and image URLs."""
+        specs = self._specifications_from_payload(payload)
+        return {
+            'specifications': specs,
+            'model': specs.get('Modelis', ''),
+            'brand': specs.get('Gamintojas', ''),
+            'price': specs.get('Kaina', ''),
+            'image_urls': self._image_urls_from_payload(payload)
+        }
+
+    def _add_spec_rows(self, specs: Dict[str, str], rows: List[List[str]]) -> None:
+        """Add key/value table rows to the specifications."""
+        for cells in rows:
+            if len(cells) >= 2:
+                key, value = cells[0], cells[1]
+                if key and value:
+                    specs[key.strip().rstrip(':')] = value.strip()
+
+    def _specifications_from_payload(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        """Extract detailed specifications from a raw product page payload."""
+        specs = {}
+        
+        try:
             # 1. Look for product info in the main product information section
-            product_info = await product_page.query_selector('div.productInfoMain')
-            if product_info:
-                # Extract product name and model
-                model_elem = await product_info.query_selector('div.model')
-                if model_elem:
-                    model_text = await model_elem.text_content()
-                    if model_text:
-                        model_parts = model_text.split(':')
-                        if len(model_parts) > 1:
-                            specs['Modelis'] = model_parts[1].strip()
+            info = payload.get('info')
+            if info:
+                if info.get('model'):
+                    model_parts = info['model'].split(':')
+                    if len(model_parts) > 1:
+                        specs['Modelis'] = model_parts[1].strip()
                 
-                # Extract price and currency
-                price_elem = await product_info.query_selector('span.productPrice')
-                if price_elem:
-                    price_text = await price_elem.text_content()
-                    if price_text:
-                        specs['Kaina'] = price_text.strip()
+                if info.get('price'):
+                    specs['Kaina'] = info['price'].strip()
                 
-                # Extract manufacturer
-                brand_elem = await product_info.query_selector('div.brand a')
-                if brand_elem:
-                    brand_text = await brand_elem.text_content()
-                    if brand_text:
-                        specs['Gamintojas'] = brand_text.strip()
+                if info.get('brand'):
+                    specs['Gamintojas'] = info['brand'].strip()
             
             # 2. Look for specifications in standard tables with class 'produktas'
-            spec_tables = await product_page.query_selector_all('table.produktas')
-            for table in spec_tables:
-                rows = await table.query_selector_all('tr')
-                for row in rows:
-                    try:
-                        # Get columns in the row
-                        cells = await row.query_selector_all('td')
-                        if len(cells) >= 2:
-                            key_cell = cells[0]
-                            value_cell = cells[1]
-                            
-                            key = await key_cell.text_content()
-                            value = await value_cell.text_content()
-                            
-                            if key and value:
-                                key = key.strip().rstrip(':')
-                                value = value.strip()
-                                specs[key] = value
-                    except Exception as e:
-                        logger.error(f"Error extracting specification row: {e}")
-                        continue
+            self._add_spec_rows(specs, payload.get('spec_rows', []))
             
             # 3. Look for specifications in the description tab
-            # First check if we need to click the description tab to load content
-            description_tab = await product_page.query_selector('#tab_description')
-            if description_tab:
-                try:
-                    # Check if tab is not active and needs to be clicked
-                    tab_class = await description_tab.get_attribute('class')
-                    if tab_class and 'selected' not in tab_class:
-                        await description_tab.click()
-                        await asyncio.sleep(1)  # Wait for tab content to load
-                except Exception as e:
-                    logger.warning(f"Error activating description tab: {e}")
-            
-            # Now look for specifications in the description content
-            detailed_specs = await product_page.query_selector('#tab-description, div.tab-container, div.description-text')
-            if detailed_specs:
-                # Look for structured specs as key-value pairs
-                spec_divs = await detailed_specs.query_selector_all('div.description-text, p, li')
-                
-                for div in spec_divs:
-                    try:
-                        # Check for content with strong tags (key-value format)
-                        strong_element = await div.query_selector('strong, b')
-                        if strong_element:
-                            key = await strong_element.text_content()
-                            # Get the text after the strong element
-                            div_text = await div.text_content()
-                            if key and div_text:
-                                value = div_text.replace(key, '').strip().strip(':').strip('-').strip()
-                                
-                                if value:
-                                    key = key.strip().rstrip(':').rstrip('-').strip()
-                                    specs[key] = value
-                        else:
-                            # Try to split text by ':' or '-' for simple key-value pairs
-                            text = await div.text_content()
-                            if text and ':' in text:
-                                parts = text.split(':', 1)
-                                if len(parts) == 2 and parts[0].strip() and parts[1].strip():
-                                    key = parts[0].strip()
-                                    value = parts[1].strip()
-                                    specs[key] = value
-                    except Exception as e:
-                        logger.error(f"Error extracting detailed specification: {e}")
-                        continue
+            description = payload.get('description')
+            if description:
+                for item in description['items']:
+                    key = item.get('key')
+                    text = item.get('text')
+                    if key is not None:
+                        # Key-value format with a strong tag, the value is the text after it
+                        if key and text:
+                            value = text.replace(key, '').strip().strip(':').strip('-').strip()
+                            if value:
+                                specs[key.strip().rstrip(':').rstrip('-').strip()] = value
+                    elif text and ':' in text:
+                        # Try to split text by ':' for simple key-value pairs
+                        parts = text.split(':', 1)
+                        if parts[0].strip() and parts[1].strip():
+                            specs[parts[0].strip()] = parts[1].strip()
                 
                 # If we couldn't extract structured data, at least save the full description
-                if not specs and detailed_specs:
-                    full_text = await detailed_specs.text_content()
-                    if full_text:
-                        specs['Aprašymas'] = full_text.strip()
+                if not specs and description.get('text') and description['text'].strip():
+                    specs['Aprašymas'] = description['text'].strip()
             
             # 4. Extract technical parameters table if available
-            tech_table = await product_page.query_selector('table.technical-parameters')
-            if tech_table:
-                rows = await tech_table.query_selector_all('tr')
-                for row in rows:
-                    try:
-                        cells = await row.query_selector_all('td')
-                        if len(cells) >= 2:
-                            key_cell = cells[0]
-                            value_cell = cells[1]
-                            
-                            key = await key_cell.text_content()
-                            value = await value_cell.text_content()
-                            
-                            if key and value:
-                                key = key.strip().rstrip(':')
-                                value = value.strip()
-                                specs[key] = value
-                    except Exception as e:
-                        logger.error(f"Error extracting technical parameter: {e}")
-                        continue
+            self._add_spec_rows(specs, payload.get('technical_rows', []))
             
             # 5. Extract product features if available
-            features = await product_page.query_selector('div.productFeatures')
-            if features:
-                feature_items = await features.query_selector_all('li')
-                if feature_items and len(feature_items) > 0:
-                    feature_texts = []
-                    for item in feature_items:
-                        feature_text = await item.text_content()
-                        if feature_text:
-                            feature_texts.append(feature_text.strip())
-                    
-                    if feature_texts:
-                        specs['Ypatybės'] = ', '.join(feature_texts)
+            feature_texts = [feature.strip() for feature in payload.get('features', []) if feature and feature.strip()]
+            if feature_texts:
+                specs['Ypatybės'] = ', '.join(feature_texts)
             
             # 6. If we still don't have enough specs, try to parse from page title and meta description
             if len(specs) < 3:
-                title = await product_page.title()
-                if title:
-                    specs['Pilnas pavadinimas'] = title.strip()
+                if payload.get('title') and payload['title'].strip():
+                    specs['Pilnas pavadinimas'] = payload['title'].strip()
                 
-                meta_desc = await product_page.query_selector('meta[name="description"]')
-                if meta_desc:
-                    content = await meta_desc.get_attribute('content')
-                    if content:
-                        specs['Meta aprašymas'] = content.strip()
+                if payload.get('meta_description') and payload['meta_description'].strip():
+                    specs['Meta aprašymas'] = payload['meta_description'].strip()
             
             logger.info(f"Extracted {len(specs)} specifications")
             return specs
@@ -742,113 +1104,37 @@ class SkytechScraper:
         except Exception as e:
             logger.error(f"Error getting specifications: {e}")
             return specs
-        finally:
-            if product_page:
-                try:
-                    await product_page.close()
-                except Exception as e:
-                    logger.warning(f"Error closing product page: {e}")
 
-    async def get_product_images(self, product_url: str) -> List[str]:
-        """Get all product images from the product detail page."""
+    def _image_urls_from_payload(self, payload: Dict[str, Any]) -> List[str]:
+        """Extract all product image URLs from a raw product page payload."""
         image_urls = []
-        product_page = None
-        
-        if not self.context:
-            logger.error("Browser context not initialized")
-            return image_urls
         
         try:
-            # Open new page for product details
-            product_page = await self.context.new_page()
-            if not product_page:
-                logger.error("Failed to create new page")
-                return image_urls
-            
-            # Navigate with retry logic
-            await product_page.goto(product_url, wait_until='domcontentloaded')
-            
-            # Wait for the main product image to load
-            await asyncio.sleep(2)  # Wait for images to load
-            
-            # Try to get high-resolution images
-            
             # Method 1: Get the main image from zoom link (highest quality)
-            main_zoom_link = await product_page.query_selector('a#zoom1')
-            if main_zoom_link:
-                href = await main_zoom_link.get_attribute('href')
-                if href:
-                    # This is usually the highest quality image
-                    full_img_url = urljoin(self.base_url, href)
-                    image_urls.append(full_img_url)
-                    logger.info(f"Found high-res main image: {full_img_url}")
+            if payload.get('zoom_href'):
+                full_img_url = urljoin(self.base_url, payload['zoom_href'])
+                image_urls.append(full_img_url)
+                logger.info(f"Found high-res main image: {full_img_url}")
             
             # Method 2: If zoom link didn't work, try the regular image but transform to large version
-            if not image_urls:
-                main_image = await product_page.query_selector('a#zoom1 img')
-                if main_image:
-                    src = await main_image.get_attribute('src')
-                    if src is not None:
-                        # Convert to large image URL by changing path patterns
-                        # Try multiple transformations to get the highest quality
-                        large_src = src
-                        # Replace /thumb/ with /large/
-                        large_src = large_src.replace('/thumb/', '/large/')
-                        # Replace /xsmall/ with /large/
-                        large_src = large_src.replace('/xsmall/', '/large/')
-                        # Replace /medium/ with /large/
-                        large_src = large_src.replace('/medium/', '/large/')
-                        # Some sites use popup for the large version
-                        large_src = large_src.replace('_thumb.', '_popup.')
-                        
-                        # Also try to use the original image by removing size indicators
-                        original_src = re.sub(r'_(thumb|small|medium|popup)\.', '.', src)
-                        
-                        # Add both versions - the system will try the first one first
-                        image_url = urljoin(self.base_url, large_src)
-                        image_urls.append(image_url)
-                        
-                        # Add original version if it's different
-                        if original_src != src:
-                            original_url = urljoin(self.base_url, original_src)
-                            if original_url not in image_urls:
-                                image_urls.append(original_url)
+            if not image_urls and payload.get('zoom_img_src') is not None:
+                image_urls.extend(self._large_image_variants(payload['zoom_img_src']))
             
-            # Method 3: Try to find additional images in the gallery
-            gallery_links = await product_page.query_selector_all('div.additionalImages a, div.imageGallery a')
-            for link in gallery_links:
-                href = await link.get_attribute('href')
+            # Method 3 and 4: Additional gallery images and hidden high-res images
+            for href in payload.get('gallery_hrefs', []) + payload.get('hidden_hrefs', []):
                 if href:
-                    # This is usually a high-quality image
                     full_img_url = urljoin(self.base_url, href)
                     if full_img_url not in image_urls:
                         image_urls.append(full_img_url)
             
-            # Method 4: Look for hidden high-res images in the page
-            hidden_imgs = await product_page.query_selector_all('div[style*="display:none"] a[href*="images/"], div.hidden a[href*="images/"]')
-            for img_link in hidden_imgs:
-                href = await img_link.get_attribute('href')
-                if href and href not in image_urls:
-                    full_img_url = urljoin(self.base_url, href)
-                    image_urls.append(full_img_url)
-            
             # Method 5: Check for JSON data that might contain image URLs
-            try:
-                json_script = await product_page.query_selector('script[type="application/ld+json"]')
-                if json_script:
-                    json_content = await json_script.text_content()
-                    if json_content:
-                        json_data = json.loads(json_content)
-                        if 'image' in json_data:
-                            image_data = json_data['image']
-                            if isinstance(image_data, list):
-                                for img_url in image_data:
-                                    if img_url and img_url not in image_urls:
-                                        image_urls.append(img_url)
-                            elif isinstance(image_data, str) and image_data not in image_urls:
-                                image_urls.append(image_data)
-            except Exception as e:
-                logger.warning(f"Error extracting images from JSON: {e}")
+            if payload.get('ld_json'):
+                try:
+                    for img_url in self._ld_json_image_urls(payload['ld_json']):
+                        if img_url not in image_urls:
+                            image_urls.append(img_url)
+                except Exception as e:
+                    logger.warning(f"Error extracting images from JSON: {e}")
             
             logger.info(f"Found {len(image_urls)} product images")
             return image_urls
@@ -856,22 +1142,142 @@ class SkytechScraper:
         except Exception as e:
             logger.error(f"Error getting product images: {e}")
             return image_urls
-        finally:
-            if product_page:
-                try:
-                    await product_page.close()
-                except Exception as e:
-                    logger.warning(f"Error closing product page: {e}")
 
-    async def save_to_pocketbase(self, product_data: Dict[str, Any]) -> None:
-        """Save a product to PocketBase."""
+    def _large_image_variants(self, src: str) -> List[str]:
+        """Turn a thumbnail src into absolute URLs of its large and original versions."""
+        image_urls = []
+        
+        # Convert to large image URL by changing path patterns
+        # Try multiple transformations to get the highest quality
+        large_src = src
+        # Replace /thumb/ with /large/
+        large_src = large_src.replace('/thumb/', '/large/')
+        # Replace /xsmall/ with /large/
+        large_src = large_src.replace('/xsmall/', '/large/')
+        # Replace /medium/ with /large/
+        large_src = large_src.replace('/medium/', '/large/')
+        # Some sites use popup for the large version
+        large_src = large_src.replace('_thumb.', '_popup.')
+        
+        # Also try to use the original image by removing size indicators
+        original_src = re.sub(r'_(thumb|small|medium|popup)\.', '.', src)
+        
+        # Add both versions - the system will try the first one first
+        image_urls.append(urljoin(self.base_url, large_src))
+        
+        # Add original version if it's different
+        if original_src != src:
+            original_url = urljoin(self.base_url, original_src)
+            if original_url not in image_urls:
+                image_urls.append(original_url)
+        
+        return image_urls
+
+    def _ld_json_image_urls(self, json_content: str) -> List[str]:
+        """Get image URLs from a JSON-LD product script."""
+        json_data = json.loads(json_content)
+        if 'image' not in json_data:
+            return []
+        
+        image_data = json_data['image']
+        if isinstance(image_data, list):
+            return [img_url for img_url in image_data if img_url]
+        if isinstance(image_data, str):
+            return [image_data]
+        return []
+
+    def _make_soup(self, html: str) -> Any:
+        """Parse HTML with lxml when it is installed, otherwise with the built-in parser."""
+        return BeautifulSoup(html, 'lxml' if LXML_AVAILABLE else 'html.parser')
+
+    def parse_product_html(self, html: str) -> Optional[Dict[str, Any]]:
+        """Extract product details from server-rendered product page HTML.
+
+        Returns None when none of the known product blocks are present, which means
+        the page has to be rendered in the browser instead.
+        """
+        soup = self._make_soup(html)
+        if not soup.select_one('div.productInfoMain, table.produktas, table.technical-parameters, a#zoom1'):
+            return None
+        
+        return self._details_from_payload(self._product_payload_from_soup(soup))
+
+    def _product_payload_from_soup(self, soup: Any) -> Dict[str, Any]:
+        """Collect the same raw payload as PRODUCT_PAGE_SCRIPT from parsed product page HTML."""
+        def text(element: Any) -> Optional[str]:
+            return element.get_text() if element else None
+        
+        def attr(element: Any, name: str) -> Optional[str]:
+            return element.get(name) if element else None
+        
+        def cell_rows(table: Any) -> List[List[str]]:
+            if not table:
+                return []
+            return [[cell.get_text() for cell in row.find_all('td')] for row in table.find_all('tr')]
+        
+        product_info = soup.select_one('div.productInfoMain')
+        # The description tab content is part of the HTML even when the tab is hidden
+        description = soup.select_one('#tab-description, div.tab-container, div.description-text')
+        features = soup.select_one('div.productFeatures')
+        meta_description = soup.select_one('meta[name="description"]')
+        ld_json = soup.select_one('script[type="application/ld+json"]')
+        
+        return {
+            'info': {
+                'model': text(product_info.select_one('div.model')),
+                'price': text(product_info.select_one('span.productPrice')),
+                'brand': text(product_info.select_one('div.brand a'))
+            } if product_info else None,
+            'spec_rows': [row for table in soup.select('table.produktas') for row in cell_rows(table)],
+            'description': {
+                'text': description.get_text(),
+                'items': [
+                    {'key': text(item.select_one('strong, b')), 'text': item.get_text()}
+                    for item in description.select('div.description-text, p, li')
+                ]
+            } if description else None,
+            'technical_rows': cell_rows(soup.select_one('table.technical-parameters')),
+            'features': [item.get_text() for item in features.select('li')] if features else [],
+            'title': soup.title.get_text() if soup.title else '',
+            'meta_description': attr(meta_description, 'content'),
+            'zoom_href': attr(soup.select_one('a#zoom1'), 'href'),
+            'zoom_img_src': attr(soup.select_one('a#zoom1 img'), 'src'),
+            'gallery_hrefs': [link.get('href') for link in soup.select('div.additionalImages a, div.imageGallery a')],
+            'hidden_hrefs': [
+                link.get('href')
+                for link in soup.select('div[style*="display:none"] a[href*="images/"], div.hidden a[href*="images/"]')
+            ],
+            'ld_json': ld_json.string if ld_json else None,
+            'description_tab_clicked': False
+        }
+
+    def _parse_total_pages_html(self, soup: Any) -> int:
+        """Get the total number of pages from parsed listing page HTML."""
+        max_page = 1
+        for link in soup.select('tr td:has(a[href*="page="]) a'):
+            match = re.search(r'page=(\d+)', link.get('href', ''))
+            if match:
+                max_page = max(max_page, int(match.group(1)))
+        return max_page
+
+    async def save_to_pocketbase(self, product_data: Dict[str, Any], existing_product: Optional[Dict[str, Any]] = None) -> None:
+        """Save a product to PocketBase, updating ``existing_product`` if it is given.
+
+        Writes and image uploads are skipped when the stored fingerprint shows nothing changed.
+        """
         try:
-            # Check if product already exists by URL
-            existing_products = self.pb_client.collection('products').get_list(
-                query_params={
-                    'filter': f'url = "{product_data["url"]}" && source = "skytech"'
-                }
-            )
+            # A URL seen again before its create is written must not be created twice
+            pending = self.existing_by_url.get(product_data['url'])
+            if not existing_product and pending and not pending.get('id'):
+                logger.info(f"Product is already being created in this run, skipping: {product_data['name']}")
+                return
+            
+            stored_fingerprint = (existing_product or {}).get('fingerprint') or ''
+            if not self.full_sync and stored_fingerprint == product_data['fingerprint']:
+                logger.info(f"Product unchanged, skipping save: {product_data['name']}")
+                self.skipped_products += 1
+                self.mark_product(product_data['url'], PERSISTED)
+                return
 
             # Create description from specifications
             specs = product_data['specifications']
@@ -929,6 +1335,7 @@ class SkytechScraper:
                 'description': description,
                 'stock': product_data['stock'],
                 'productType': 'physical',
+                'fingerprint': product_data['fingerprint'],
                 'updated': datetime.now().isoformat()
             }
             
@@ -937,172 +1344,338 @@ class SkytechScraper:
                 form_data['model'] = product_data['model']
 
             # If this is a new record, add created timestamp
-            if not existing_products.items:
+            if not existing_product:
                 form_data['created'] = product_data['created']
 
             logger.info(f"Preparing to save product: {form_data['name']}")
 
-            # First save/update the product without the images
-            try:
-                if existing_products.items:
-                    # Update existing product
-                    product_id = existing_products.items[0].id
-                    logger.info(f"Updating existing product with ID: {product_id}")
-                    self.pb_client.collection('products').update(product_id, form_data)
-                else:
-                    # Create new product
-                    logger.info("Creating new product")
-                    result = self.pb_client.collection('products').create(form_data)
-                    product_id = result.id
+            # Images are only uploaded again when the image URL list changed
+            images_changed = (
+                self.full_sync
+                or not existing_product
+                or not existing_product.get('image')
+                or stored_fingerprint.split('.')[-1] != product_data['fingerprint'].split('.')[-1]
+            )
 
-                # Now upload all product images at once - the first will be the thumbnail, all go to gallery
-                if product_data.get('image_urls'):
-                    await self.stream_all_images_to_pocketbase(product_id, product_data['image_urls'], product_data['name'])
+            upload_images = bool(product_data.get('image_urls')) and images_changed
+            if upload_images:
+                # The images part of the fingerprint is only stored once the upload succeeded,
+                # so a failed upload is retried by the next run
+                form_data['fingerprint'] = product_data['fingerprint'].rsplit('.', 1)[0] + '.'
+
+            async def after_save(result: Dict[str, Any]) -> None:
+                # Keep the index current so later rows update instead of creating duplicates
+                self._index_existing_product(result)
+
+                # Now upload all product images at once - the first will be the thumbnail, the rest go to the gallery
+                if upload_images:
+                    uploaded = await self.stream_all_images_to_pocketbase(result['id'], product_data['image_urls'], product_data['name'])
+                    if not uploaded:
+                        logger.error(f"Image upload failed, product will be retried: {product_data['name']}")
+                        self.mark_product(product_data['url'], FAILED)
+                        return
+                    try:
+                        await self.pb.update('products', result['id'], {'fingerprint': product_data['fingerprint']})
+                    except ClientResponseError as e:
+                        logger.error(f"Could not store the fingerprint of {product_data['name']}: {e}")
+                        self.mark_product(product_data['url'], FAILED)
+                        return
+                    result['fingerprint'] = product_data['fingerprint']
+                elif product_data.get('image_urls'):
+                    logger.info(f"Images unchanged, skipping upload for: {product_data['name']}")
 
                 logger.info(f"Successfully saved product in PocketBase: {product_data['name']}")
+                self.mark_product(product_data['url'], PERSISTED)
 
-            except Exception as e:
-                logger.error(f"Error saving to PocketBase: {str(e)}")
-                # Log the actual data that caused the error
-                logger.error(f"Problematic product data: {json.dumps(product_data, default=str, indent=2)}")
-                # Save to JSON as backup
-                await self.save_to_json()
+            # Index the URL right away; a new record is a placeholder without an ID until it is written
+            self.existing_by_url[product_data['url']] = existing_product or {'url': product_data['url']}
+            
+            # The record is written with the next batch; images follow once it has an ID
+            await self.product_writer.upsert(
+                form_data,
+                existing_product['id'] if existing_product else None,
+                on_success=after_save
+            )
 
         except Exception as e:
             logger.error(f"Error in save_to_pocketbase: {str(e)}")
-            await self.save_to_json()
+            self.mark_product(product_data['url'], FAILED)
+            self.product_writer.dead_letter(product_data, (existing_product or {}).get('id'), 0, str(e))
 
-    async def save_to_json(self, filename: Optional[str] = None) -> None:
-        """Save scraped products to JSON file as backup."""
+    def mark_product(self, product_url: str, status: str) -> None:
+        """Record the crawl state of a product, if the frontier is open."""
+        if self.frontier:
+            self.frontier.mark_product(product_url, status)
+
+    def save_to_checkpoint(self, product_data: Dict[str, Any]) -> None:
+        """Append a scraped product to the JSONL checkpoint."""
+        if not self.checkpoint:
+            return
         try:
-            # Generate filename if not provided
-            if filename is None:
-                filename = f'skytech_desktop_products.json'
-                
-            # Ensure we're saving to the correct directory
-            file_path = os.path.join(os.getcwd(), filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.products_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Saved {len(self.products_data)} desktop products to {file_path} (backup)")
+            self.checkpoint.write(product_data)
         except Exception as e:
-            logger.error(f"Error saving to JSON backup: {e}")
+            logger.error(f"Error writing product to checkpoint: {e}")
+
+    def _listing_page_url(self, page_num: int) -> str:
+        """Build the URL of a listing page."""
+        if page_num == 1:
+            return self.category_url
+        return f"{self.category_url.split('?')[0]}?grp=0&sort=5d&pagesize={self.products_per_page}&page={page_num}"
+
+    async def get_listing_page(self, page_num: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Get the listing rows and the total page count of a listing page.
+
+        In HTTP mode the page is fetched and parsed without the browser when possible, and the
+        browser is only used when the fetched HTML has no listing rows; a failed fetch raises.
+        """
+        url = self._listing_page_url(page_num)
+        
+        if self.mode == 'http':
+            html = await self.fetch_html(url)
+            if html is None:
+                # Only pages that need JavaScript go to the browser; failed fetches fail the page
+                raise Exception(f"Could not fetch listing page {page_num}")
+            soup = self._make_soup(html)
+            product_rows = soup.select('table.productListing tr.productListing')
+            if product_rows:
+                listings = [self.parse_listing_row(row) for row in product_rows]
+                return [listing for listing in listings if listing], self._parse_total_pages_html(soup)
+            logger.info(f"Listing page {page_num} needs the browser, falling back to Playwright")
+            await self.ensure_browser()
+        
+        return await self._get_listing_page_browser(url, page_num)
 
-    async def _get_total_pages(self) -> int:
-        """Get the total number of pages from the pagination."""
+    async def _get_listing_page_browser(self, url: str, page_num: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Load a listing page in the browser and read its rows and total page count."""
+        if not self.listing_pool:
+            raise Exception("Browser page not initialized")
+        
+        async with self.listing_pool.lease() as page:
+            return await self._read_listing_page(page, url, page_num)
+
+    async def _read_listing_page(self, page: Page, url: str, page_num: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Navigate a listing page and read its rows and total page count."""
+        logger.info(f"Navigating to URL: {url}")
+        # Navigate to listing page with retry logic
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                await self.goto(page, url, timeout=60000)  # Increased timeout
+                logger.info(f"Successfully loaded listing page {page_num}")
+                break
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    logger.error(f"Failed to load page after {max_retries} attempts")
+                    raise
+                logger.warning(f"Retry {attempt + 1}/{max_retries} loading listing page {page_num}: {e}")
+        
+        # Wait for product table to load
+        await self.waiter.for_selector(
+            page,
+            'table.productListing tr.productListing',
+            'listing_rows',
+            replaced_sleep=2.0 if page_num > 1 else 0.0,
+            required=True
+        )
+        
+        # Read all product rows (skip the header row) and the pagination in a single round-trip
+        payload = await page.evaluate(LISTING_PAGE_SCRIPT)
+        listings = payload['listings']
+        if any(listing is None for listing in listings):
+            logger.warning("Could not find product name element")
+        
+        return [listing for listing in listings if listing], payload['total_pages']
+
+    async def process_listing(self, listing: Dict[str, Any]) -> None:
+        """Scrape and save the product of one listing row."""
+        product_url = urljoin(self.base_url, listing.get('href') or '')
         try:
-            # Find the pagination links
-            pagination_links = []
-            if self.page:
-                pagination_links = await self.page.query_selector_all('tr td:has(a[href*="page="]) a')
+            if self.frontier and self.frontier.product_status(product_url) == PERSISTED:
+                logger.info(f"Already persisted in the resumed run, skipping product: {product_url}")
+                return
             
-            if not pagination_links or len(pagination_links) == 0:
-                return 1  # Only one page
-                
-            # Get the last pagination link that has a page number
-            max_page = 1
-            for link in pagination_links:
-                href = await link.get_attribute('href')
-                if href:
-                    match = re.search(r'page=(\d+)', href)
-                    if match:
-                        page_num = int(match.group(1))
-                        max_page = max(max_page, page_num)
+            name, _ = self.parse_listing_name(listing.get('name') or '')
+            existing_product = self.find_existing_product(product_url, self.generate_slug(name))
+            if existing_product and not existing_product.get('id'):
+                logger.info(f"Product is already being created in this run, skipping: {product_url}")
+                return
+            
+            # Skip the product page entirely when price and stock are unchanged and the images are stored
+            if (existing_product and existing_product.get('image') and not self.full_sync
+                    and self.is_listing_unchanged(listing, existing_product)):
+                logger.info(f"Listing unchanged, skipping product: {product_url}")
+                self.skipped_products += 1
+                self.mark_product(product_url, PERSISTED)
+                return
             
-            return max_page
+            product_data = await self.extract_product_data(listing)
+            if product_data:
+                self.mark_product(product_url, EXTRACTED)
+                # Save to both the checkpoint and PocketBase
+                self.save_to_checkpoint(product_data)
+                await self.save_to_pocketbase(product_data, existing_product)
+            else:
+                self.mark_product(product_url, FAILED)
         except Exception as e:
-            logger.error(f"Error getting total pages: {e}")
-            return 1  # Default to 1 page if there's an error
+            logger.error(f"Error processing product: {e}")
+            self.mark_product(product_url, FAILED)
+
+    async def run_product_workers(self, queue: asyncio.Queue) -> None:
+        """Process ``(page number, listing row)`` items from the queue with a bounded pool of workers.
+
+        Workers stop at a ``None`` item. A listing page is marked done in the crawl frontier once
+        all of its rows were processed; rows without a page number are resumed leftovers.
+        """
+        async def worker() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                page_num, listing = item
+                await self.process_listing(listing)
+                
+                if page_num is not None:
+                    self._pending_rows[page_num] -= 1
+                    if self._pending_rows[page_num] == 0:
+                        self.frontier.mark_page_done(page_num)
+                        logger.info(f"Finished all products of listing page {page_num}")
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def prefetch_listing_pages(self, page_nums: List[int], queue: asyncio.Queue,
+                                     first_listings: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Fetch listing pages concurrently and queue their rows for the product workers.
+
+        At most ``listing_concurrency`` pages are fetched at once, and rows are queued as soon as
+        their page arrives, so the workers never wait for pagination. ``first_listings`` are the
+        already fetched rows of page 1. Returns the number of pages that could not be fetched.
+        """
+        semaphore = asyncio.Semaphore(self.listing_concurrency)
+        failed_pages = 0
+
+        async def fetch(page_num: int) -> None:
+            nonlocal failed_pages
+            try:
+                if page_num == 1 and first_listings:
+                    listings = first_listings
+                else:
+                    async with semaphore:
+                        listings, _ = await self.get_listing_page(page_num)
+            except Exception as e:
+                logger.error(f"Error fetching listing page {page_num}: {e}")
+                failed_pages += 1
+                return
+            
+            if not listings:
+                logger.info(f"No products found on listing page {page_num}")
+                return
+            
+            logger.info(f"Found {len(listings)} products on page {page_num}")
+            self.frontier.add_products(
+                {urljoin(self.base_url, listing.get('href') or ''): listing for listing in listings},
+                page_num
+            )
+            self._pending_rows[page_num] = len(listings)
+            for listing in listings:
+                queue.put_nowait((page_num, listing))
+
+        await asyncio.gather(*(fetch(page_num) for page_num in page_nums))
+        return failed_pages
 
     async def scrape_products(self) -> None:
         """Main scraping function for desktop computers from skytech.lt."""
         try:
-            logger.info("Starting desktop computer scraper for skytech.lt...")
-            await self.init_browser()
-            
-            if not self.page:
-                raise Exception("Browser page not initialized")
+            logger.info(f"Starting desktop computer scraper for skytech.lt in {self.mode} mode...")
+            self.frontier = CrawlFrontier(os.path.join(os.getcwd(), self.state_path), resume=self.resume)
+            # A resumed run keeps the products already checkpointed by the interrupted one
+            self.checkpoint = JsonlWriter(
+                os.path.join(os.getcwd(), self.checkpoint_path),
+                compression=self.checkpoint_compression,
+                append=self.resume
+            )
+            await self.authenticate_pocketbase()
+            logger.info("PocketBase authentication completed")
 
-            logger.info(f"Navigating to URL: {self.category_url}")
-            # Navigate to category page with retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    await self.page.goto(
-                        self.category_url,
-                        wait_until='domcontentloaded',
-                        timeout=60000  # Increased timeout
-                    )
-                    logger.info("Successfully loaded the desktop computers page")
-                    break
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        logger.error(f"Failed to load page after {max_retries} attempts")
-                        raise
-                    logger.warning(f"Retry {attempt + 1}/{max_retries} loading main page: {e}")
-                    await asyncio.sleep(2)
+            # The HTTP session is used for images in both modes
+            await self.init_http_session()
+            if self.mode == 'browser':
+                await self.init_browser()
 
-            # Get total number of pages
-            total_pages = await self._get_total_pages()
-            logger.info(f"Found {total_pages} pages to process")
+            # Resolve the category once so concurrent workers don't race to create it
+            await self.get_category_id()
+            
+            # Create-vs-update decisions use this index instead of one query per product
+            await self.load_existing_products()
 
-            page_num = 1
-            while page_num <= total_pages:
-                try:
-                    logger.info(f"Processing page {page_num} of {total_pages}")
-                    
-                    # Wait for product table to load
-                    await self.page.wait_for_selector('table.productListing tr.productListing', timeout=10000)
-                    
-                    # Get all product rows (skip the header row)
-                    product_rows = await self.page.query_selector_all('table.productListing tr.productListing')
-                    
-                    if not product_rows:
-                        logger.info("No products found on this page")
-                        break
+            # Product workers consume listing rows while the listing pages are still being fetched
+            queue: asyncio.Queue = asyncio.Queue()
+            workers = asyncio.create_task(self.run_product_workers(queue))
+            try:
+                # Retry the unfinished products of pages the interrupted run already completed
+                unfinished = self.frontier.unfinished_listings()
+                if unfinished:
+                    logger.info(f"Retrying {len(unfinished)} unfinished products from the resumed run")
+                for listing in unfinished:
+                    queue.put_nowait((None, listing))
 
-                    logger.info(f"Found {len(product_rows)} products on page {page_num}")
+                # Get the first page and the total number of pages, unless the resumed run already knows it
+                listings: List[Dict[str, Any]] = []
+                total_pages = self.frontier.total_pages()
+                if total_pages is None:
+                    listings, total_pages = await self.get_listing_page(1)
+                    self.frontier.set_total_pages(total_pages)
+                    if self.shard_index != 0:
+                        # Page 1 belongs to the first shard
+                        listings = []
+                logger.info(f"Found {total_pages} pages to process")
 
-                    # Process each product row
-                    for product_row in product_rows:
-                        try:
-                            product_data = await self.extract_product_data(product_row)
-                            if product_data:
-                                # Save to both memory and PocketBase
-                                self.products_data.append(product_data)
-                                await self.save_to_pocketbase(product_data)
-                        except Exception as e:
-                            logger.error(f"Error processing product: {e}")
-                            continue
-
-                    # Move to the next page if there are more pages
-                    if page_num < total_pages:
-                        # Construct the URL for the next page
-                        next_page_url = f"{self.category_url.split('?')[0]}?grp=0&sort=5d&pagesize={self.products_per_page}&page={page_num + 1}"
-                        
-                        logger.info(f"Navigating to next page: {next_page_url}")
-                        await self.page.goto(next_page_url, wait_until='domcontentloaded')
-                        await asyncio.sleep(2)  # Wait for page to load
-                        
-                        page_num += 1
-                    else:
-                        logger.info("No more pages to process")
-                        break
-                        
-                except Exception as e:
-                    logger.error(f"Error processing page {page_num}: {e}")
-                    # Save what we have so far as backup
-                    await self.save_to_json()
-                    break
+                shard_pages = [
+                    page_num for page_num in range(1, total_pages + 1)
+                    if (page_num - 1) % self.shard_count == self.shard_index
+                ]
+                page_nums = [page_num for page_num in shard_pages if not self.frontier.is_page_done(page_num)]
+                if len(page_nums) < len(shard_pages):
+                    logger.info(f"Skipping {len(shard_pages) - len(page_nums)} pages completed by the resumed run")
 
-            # Final backup save
-            await self.save_to_json()
+                failed_pages = await self.prefetch_listing_pages(page_nums, queue, listings)
+                if failed_pages:
+                    logger.info(f"{failed_pages} listing pages could not be fetched, run again with --resume to retry them")
+            finally:
+                # Let the workers finish the queued rows, then stop them
+                for _ in range(self.concurrency):
+                    queue.put_nowait(None)
+                await workers
+
+            logger.info(f"Skipped {self.skipped_products} unchanged products")
+            logger.info(f"Crawl state: {self.frontier.summary()}")
+            self.waiter.log_report()
+            if self.resource_blocker and self.browser:
+                self.resource_blocker.log_report()
+            for pool in (self.listing_pool, self.detail_pool):
+                if pool:
+                    pool.log_report()
+            self.rate_limiter.log_report()
             
         except Exception as e:
             logger.error(f"Error during scraping: {e}")
-            # Try to save what we have even if there was an error
-            await self.save_to_json()
             raise
         finally:
+            # Write the last partial batch and wait for its image uploads before closing the sessions
+            try:
+                await self.product_writer.close()
+            except Exception as e:
+                logger.error(f"Error flushing product writes: {e}")
+            await self.close_http_session()
+            await self.pb.close()
+            # Everything scraped so far is already in the checkpoint; this only syncs the tail
+            if self.checkpoint:
+                self.checkpoint.close()
+            if self.frontier:
+                self.frontier.close()
+            if self.image_cache:
+                self.image_cache.close()
             try:
                 await self.close_browser()
             except Exception as e:
@@ -1110,8 +1683,152 @@ class SkytechScraper:
 
 async def main() -> None:
     """Main function to start the scraping process."""
-    scraper = SkytechScraper()
-    await scraper.scrape_products()
+    parser = argparse.ArgumentParser(description="Scrape desktop computers from skytech.lt into PocketBase")
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=int(os.getenv('SCRAPER_CONCURRENCY', '4')),
+        help="Number of product pages processed in parallel (default: 4)"
+    )
+    parser.add_argument(
+        '--listing-concurrency',
+        type=int,
+        default=3,
+        help="Number of listing pages fetched in parallel (default: 3)"
+    )
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=int(os.getenv('SCRAPER_SHARDS', '1')),
+        help="Number of processes the listing pages are split across, each with its own clients (default: 1)"
+    )
+    parser.add_argument(
+        '--mode',
+        choices=['http', 'browser'],
+        default=os.getenv('SCRAPER_MODE', 'http'),
+        help="'http' parses server-rendered HTML and only uses the browser when needed, 'browser' renders every page (default: http)"
+    )
+    parser.add_argument(
+        '--image-downloads',
+        type=int,
+        default=8,
+        help="Number of images downloaded in parallel (default: 8)"
+    )
+    parser.add_argument(
+        '--image-uploads',
+        type=int,
+        default=4,
+        help="Number of images uploaded to PocketBase in parallel (default: 4)"
+    )
+    parser.add_argument(
+        '--image-buffer-mb',
+        type=float,
+        default=5,
+        help="In-memory buffer per image in MB, larger images spill to a temporary file (default: 5)"
+    )
+    parser.add_argument(
+        '--no-image-spill',
+        action='store_true',
+        help="Skip images larger than the buffer instead of spilling them to disk"
+    )
+    parser.add_argument(
+        '--image-cache',
+        default=os.getenv('IMAGE_CACHE_DIR'),
+        help="Directory of the content-addressed image cache shared across runs (default: disabled)"
+    )
+    parser.add_argument(
+        '--image-cache-mb',
+        type=int,
+        default=2048,
+        help="Maximum image cache size in MB before least recently used images are evicted (default: 2048)"
+    )
+    parser.add_argument(
+        '--full-sync',
+        action='store_true',
+        help="Re-scrape and rewrite every product, even when its fingerprint is unchanged"
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=50,
+        help="Number of product writes sent to PocketBase per batch request (default: 50)"
+    )
+    parser.add_argument(
+        '--dead-letter',
+        default='skytech_dead_letter.jsonl',
+        help="JSONL file that products failing to save are appended to (default: skytech_dead_letter.jsonl)"
+    )
+    parser.add_argument(
+        '--no-block-resources',
+        action='store_true',
+        help="Let the browser load images, fonts, stylesheets, media and trackers"
+    )
+    parser.add_argument(
+        '--page-max-uses',
+        type=int,
+        default=50,
+        help="Navigations after which a pooled browser page is closed and replaced (default: 50)"
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=4.0,
+        help="Starting requests per second per host; adapts to the host's responses (default: 4)"
+    )
+    parser.add_argument(
+        '--max-rate',
+        type=float,
+        default=16.0,
+        help="Highest requests per second per host (default: 16)"
+    )
+    parser.add_argument(
+        '--state',
+        default='skytech_crawl_state.db',
+        help="SQLite file recording crawl progress (default: skytech_crawl_state.db)"
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Continue the crawl recorded in --state instead of starting from page 1"
+    )
+    parser.add_argument(
+        '--checkpoint',
+        default='skytech_desktop_products.jsonl',
+        help="JSONL file every scraped product is appended to (default: skytech_desktop_products.jsonl)"
+    )
+    parser.add_argument(
+        '--checkpoint-compression',
+        choices=['gzip', 'zstd'],
+        help="Compress the checkpoint, adding a .gz or .zst suffix (default: uncompressed)"
+    )
+    args = parser.parse_args()
+
+    scraper_kwargs = dict(
+        concurrency=args.concurrency,
+        listing_concurrency=args.listing_concurrency,
+        mode=args.mode,
+        full_sync=args.full_sync,
+        image_downloads=args.image_downloads,
+        image_uploads=args.image_uploads,
+        image_buffer_bytes=int(args.image_buffer_mb * 1024 * 1024),
+        image_spill=not args.no_image_spill,
+        image_cache_dir=args.image_cache,
+        image_cache_bytes=args.image_cache_mb * 1024 * 1024,
+        batch_size=args.batch_size,
+        dead_letter_path=args.dead_letter,
+        checkpoint_path=args.checkpoint,
+        checkpoint_compression=args.checkpoint_compression,
+        state_path=args.state,
+        resume=args.resume,
+        block_resources=not args.no_block_resources,
+        page_max_uses=args.page_max_uses,
+        request_rate=args.rate,
+        max_request_rate=args.max_rate
+    )
+    if args.shards > 1:
+        await run_sharded(SkytechScraper, scraper_kwargs, args.shards)
+    else:
+        await SkytechScraper(**scraper_kwargs).scrape_products()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,122 @@
+from typing import Dict, List, AsyncIterator
+from contextlib import asynccontextmanager
+import logging
+import asyncio
+import time
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+class PagePool:
+    """A fixed-size pool of warm browser pages leased out one navigation at a time.
+
+    Pages are created lazily up to ``size``, reset to ``about:blank`` when they are returned so no
+    DOM or script state carries over, and recycled (closed and replaced by a fresh page) after
+    ``max_uses`` leases or when they crashed, which contains Chromium memory growth on long crawls. The pool tracks
+    how busy it was; ``log_report`` shows utilization and how long callers waited for a page.
+    """
+
+    def __init__(self, context: BrowserContext, size: int, name: str = 'pages',
+                 max_uses: int = 50, default_timeout: int = 30000):
+        self.context = context
+        self.size = max(1, size)
+        self.name = name
+        self.max_uses = max(1, max_uses)
+        self.default_timeout = default_timeout
+
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._uses: Dict[Page, int] = {}
+        self._open = 0
+        self._create_lock = asyncio.Lock()
+
+        self.started = time.monotonic()
+        self.leases = 0
+        self.created = 0
+        self.recycled = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Page]:
+        """Lease a page for one use, waiting while all pages are busy."""
+        requested = time.monotonic()
+        page = await self._acquire()
+        leased = time.monotonic()
+        self.wait_seconds += leased - requested
+        self.leases += 1
+        try:
+            yield page
+        finally:
+            self.busy_seconds += time.monotonic() - leased
+            await self._release(page)
+
+    async def _acquire(self) -> Page:
+        """Take an idle page, opening a new one while the pool is below its size."""
+        if self._idle.empty():
+            async with self._create_lock:
+                if self._open < self.size:
+                    self._open += 1
+                    try:
+                        return await self._new_page()
+                    except Exception:
+                        self._open -= 1
+                        raise
+        return await self._idle.get()
+
+    async def _new_page(self) -> Page:
+        page = await self.context.new_page()
+        page.set_default_timeout(self.default_timeout)
+        self._uses[page] = 0
+        self.created += 1
+        return page
+
+    async def _release(self, page: Page) -> None:
+        """Reset a returned page for its next use, or recycle it when it is worn out or broken."""
+        self._uses[page] = self._uses.get(page, 0) + 1
+        if not page.is_closed() and self._uses[page] < self.max_uses:
+            try:
+                await page.goto('about:blank', timeout=5000)
+                self._idle.put_nowait(page)
+                return
+            except Exception as e:
+                logger.debug(f"Could not reset {self.name} page, recycling it: {e}")
+
+        self.recycled += 1
+        self._uses.pop(page, None)
+        try:
+            await page.close()
+        except Exception as e:
+            logger.debug(f"Error closing recycled {self.name} page: {e}")
+        
+        # Open the replacement right away so callers waiting for an idle page are woken
+        try:
+            self._idle.put_nowait(await self._new_page())
+        except Exception as e:
+            logger.warning(f"Could not replace recycled {self.name} page: {e}")
+            self._open -= 1
+
+    async def close(self) -> None:
+        """Close the idle pages."""
+        pages: List[Page] = []
+        while not self._idle.empty():
+            pages.append(self._idle.get_nowait())
+        for page in pages:
+            try:
+                await page.close()
+            except Exception as e:
+                logger.debug(f"Error closing {self.name} page: {e}")
+        self._open -= len(pages)
+        self._uses.clear()
+
+    def utilization(self) -> float:
+        """Share of the pool's page-time spent leased since it was created."""
+        elapsed = time.monotonic() - self.started
+        return self.busy_seconds / (self.size * elapsed) if elapsed > 0 else 0.0
+
+    def log_report(self) -> None:
+        """Log pool usage."""
+        mean_wait = self.wait_seconds / self.leases if self.leases else 0.0
+        logger.info(
+            f"Page pool '{self.name}': {self.leases} leases, {self.utilization():.0%} utilization, "
+            f"{mean_wait:.2f}s mean wait, {self.created} pages opened, {self.recycled} recycled"
+        )
@@ -0,0 +1,242 @@
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+import logging
+import asyncio
+import json as json_module
+import time
+import aiohttp
+from aiohttp import ClientTimeout
+from pocketbase.models.admin import Admin
+from pocketbase.stores.base_auth_store import BaseAuthStore
+from pocketbase.utils import ClientResponseError
+from rate_limiter import RateLimiter, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# A file part of a multipart request: (field name, file name, data, MIME type)
+FilePart = Tuple[str, str, Any, str]
+
+class AsyncPocketBase:
+    """Non-blocking PocketBase client used by the scrapers and scripts.
+
+    All requests share one keep-alive aiohttp connection pool and a concurrency limit. Failed
+    requests are retried with exponential backoff, and an expired admin token is refreshed
+    (or re-obtained with the stored credentials) once before a request gives up. Errors are
+    raised as the SDK's ``ClientResponseError``, so callers handle them like SDK errors.
+    """
+
+    def __init__(self, base_url: str, concurrency: int = 8, max_retries: int = 3,
+                 auth_store: Optional[BaseAuthStore] = None, rate_limiter: Optional[RateLimiter] = None):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(1, max_retries)
+        # Share the token of an existing SDK client by passing its auth_store
+        self.auth_store = auth_store or BaseAuthStore()
+        # Optional limiter shared with the scraper's other hosts
+        self.rate_limiter = rate_limiter
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._auth_lock = asyncio.Lock()
+        self._credentials: Optional[Tuple[str, str]] = None
+        # Unknown until the first batch request is answered
+        self.batch_supported: Optional[bool] = None
+
+    async def open(self) -> None:
+        """Create the shared connection pool."""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=ClientTimeout(total=120))
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> 'AsyncPocketBase':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def auth_with_password(self, email: str, password: str) -> Dict[str, Any]:
+        """Authenticate as an admin and keep the credentials for re-authentication."""
+        self._credentials = (email, password)
+        data = await self.request(
+            'POST',
+            '/api/admins/auth-with-password',
+            json={'identity': email, 'password': password},
+            authenticate=False
+        )
+        self.auth_store.save(data.get('token', ''), Admin(data.get('admin', {})))
+        return data
+
+    async def refresh_auth(self, failed_token: Optional[str] = None) -> None:
+        """Refresh the admin token, falling back to a new password login if refreshing fails.
+
+        ``failed_token`` is the token a request was rejected with; if another request already
+        replaced it, nothing is done.
+        """
+        async with self._auth_lock:
+            if failed_token is not None and self.auth_store.token != failed_token:
+                return
+            try:
+                data = await self.request('POST', '/api/admins/auth-refresh', retry_auth=False)
+                self.auth_store.save(data.get('token', ''), Admin(data.get('admin', {})))
+                logger.info("PocketBase token refreshed")
+            except ClientResponseError:
+                if not self._credentials:
+                    raise
+                logger.info("PocketBase token refresh failed, authenticating again")
+                await self.auth_with_password(*self._credentials)
+
+    async def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                      json: Optional[Dict[str, Any]] = None, fields: Optional[Dict[str, Any]] = None,
+                      files: Optional[List[FilePart]] = None, authenticate: bool = True,
+                      retry_auth: bool = True) -> Any:
+        """Send a request and return the decoded JSON response.
+
+        ``fields`` and ``files`` are sent as multipart form data. File data may be bytes or
+        a seekable file object, which is rewound before each attempt.
+        """
+        await self.open()
+        assert self.session is not None
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(self.max_retries):
+            headers = {}
+            token = self.auth_store.token
+            if authenticate and token:
+                headers['Authorization'] = token
+
+            data = None
+            if fields is not None or files:
+                data = aiohttp.FormData()
+                for key, value in (fields or {}).items():
+                    data.add_field(key, value if isinstance(value, str) else str(value))
+                for field, filename, content, content_type in files or []:
+                    if hasattr(content, 'seek'):
+                        content.seek(0)
+                    data.add_field(field, content, filename=filename, content_type=content_type)
+
+            try:
+                async with self._semaphore:
+                    if self.rate_limiter:
+                        await self.rate_limiter.acquire(url)
+                    started = time.monotonic()
+                    async with self.session.request(method, url, params=params, json=json, data=data, headers=headers) as response:
+                        body = await response.text()
+                        status = response.status
+                        retry_after = response.headers.get('Retry-After')
+                if self.rate_limiter:
+                    self.rate_limiter.record(url, status, time.monotonic() - started, retry_after=retry_after)
+            except CircuitOpenError as e:
+                raise ClientResponseError(str(e), url=url, original_error=e)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if self.rate_limiter:
+                    self.rate_limiter.record(url, error=True)
+                if attempt == self.max_retries - 1:
+                    raise ClientResponseError(f"Request to {url} failed: {e}", url=url, original_error=e)
+                logger.warning(f"Retry {attempt + 1}/{self.max_retries} for {method} {path}: {e}")
+                await asyncio.sleep(2 ** attempt)
+                continue
+
+            try:
+                response_data = json_module.loads(body) if body else {}
+            except ValueError:
+                response_data = {'message': body}
+
+            if status < 400:
+                return response_data
+
+            if status == 401 and authenticate and retry_auth:
+                await self.refresh_auth(token)
+                retry_auth = False
+                continue
+
+            if (status == 429 or status >= 500) and attempt < self.max_retries - 1:
+                logger.warning(f"Retry {attempt + 1}/{self.max_retries} for {method} {path}: status {status}")
+                await asyncio.sleep(2 ** attempt)
+                continue
+
+            message = response_data.get('message') if isinstance(response_data, dict) else None
+            raise ClientResponseError(
+                message or f"Request failed with status {status}",
+                url=url,
+                status=status,
+                data=response_data
+            )
+
+        raise ClientResponseError(f"Request to {url} failed after {self.max_retries} attempts", url=url)
+
+    async def batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send several JSON create/update requests and return one ``{'status', 'body'}`` result per request.
+
+        Requests are ``{'method', 'url', 'body'}`` dicts and go through PocketBase's batch API in a
+        single transaction. If the server has no batch API (older versions, or batching disabled in
+        the settings), they are sent individually over the pool instead. A rejected batch is also
+        resent individually, so one invalid record does not fail the others.
+        """
+        if not requests:
+            return []
+
+        if self.batch_supported is not False:
+            try:
+                results = await self.request('POST', '/api/batch', json={'requests': requests})
+                self.batch_supported = True
+                return [{'status': result.get('status', 200), 'body': result.get('body') or {}} for result in results]
+            except ClientResponseError as e:
+                if e.status in (403, 404):
+                    logger.info(f"PocketBase batch API unavailable (status {e.status}), sending records individually")
+                    self.batch_supported = False
+                elif e.status != 400:
+                    raise
+                else:
+                    logger.warning("PocketBase rejected the batch, resending its records individually")
+
+        return await asyncio.gather(*(self._send_batch_request(request) for request in requests))
+
+    async def _send_batch_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one request of a batch on its own, returning its result instead of raising."""
+        try:
+            body = await self.request(request['method'], request['url'], json=request.get('body'))
+            return {'status': 200, 'body': body}
+        except ClientResponseError as e:
+            return {'status': e.status, 'body': e.data or {'message': str(e)}}
+
+    async def get_list(self, collection: str, page: int = 1, per_page: int = 30,
+                       params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Get one page of records, as PocketBase returns it (``items``, ``page``, ``perPage``...)."""
+        query = dict(params or {})
+        query.update({'page': page, 'perPage': per_page})
+        return await self.request('GET', f'/api/collections/{collection}/records', params=query)
+
+    async def iterate(self, collection: str, per_page: int = 500,
+                      params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every matching record, reading the collection page by page without total counts."""
+        query = dict(params or {})
+        query.setdefault('skipTotal', 1)
+        page = 1
+        while True:
+            result = await self.get_list(collection, page, per_page, query)
+            items = result.get('items', [])
+            for item in items:
+                yield item
+            if len(items) < per_page:
+                return
+            page += 1
+
+    async def create(self, collection: str, body: Dict[str, Any],
+                     files: Optional[List[FilePart]] = None) -> Dict[str, Any]:
+        """Create a record, as multipart form data when files are given."""
+        if files:
+            return await self.request('POST', f'/api/collections/{collection}/records', fields=body, files=files)
+        return await self.request('POST', f'/api/collections/{collection}/records', json=body)
+
+    async def update(self, collection: str, record_id: str, body: Optional[Dict[str, Any]] = None,
+                     files: Optional[List[FilePart]] = None) -> Dict[str, Any]:
+        """Update a record, as multipart form data when files are given."""
+        path = f'/api/collections/{collection}/records/{record_id}'
+        if files:
+            return await self.request('PATCH', path, fields=body or {}, files=files)
+        return await self.request('PATCH', path, json=body or {})
@@ -0,0 +1,151 @@
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+import logging
+import asyncio
+import time
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+class RateLimiter:
+    """Shared per-host token buckets with adaptive rates and circuit breakers.
+
+    Every host (the shop, the image CDNs, PocketBase) gets its own bucket that starts at
+    ``initial_rate`` requests per second. Healthy responses raise the rate additively up to
+    ``max_rate``; 429 and 5xx responses, connection errors and latency spikes cut it
+    multiplicatively down to ``min_rate``, and a ``Retry-After`` pauses the host. After
+    ``failure_threshold`` failures in a row the host's circuit opens and requests fail fast with
+    ``CircuitOpenError`` for ``cooldown`` seconds (doubling on every repeated trip); then a single
+    probe request is let through and closes the circuit again if it succeeds.
+
+    Callers ``await acquire(url)`` before a request and ``record(url, ...)`` its outcome.
+    ``overrides`` sets different ``initial_rate``/``max_rate``/``min_rate`` values per host.
+    """
+
+    def __init__(self, initial_rate: float = 4.0, min_rate: float = 0.5, max_rate: float = 16.0,
+                 failure_threshold: int = 5, cooldown: float = 30.0,
+                 overrides: Optional[Dict[str, Dict[str, float]]] = None):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.overrides = overrides or {}
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+
+    def _host(self, url: str) -> Dict[str, Any]:
+        """Bucket state of the URL's host, created on first use."""
+        host = urlparse(url).hostname or url
+        state = self.hosts.get(host)
+        if state is None:
+            settings = self.overrides.get(host, {})
+            rate = settings.get('initial_rate', self.initial_rate)
+            state = {
+                'host': host,
+                'rate': rate,
+                'min_rate': settings.get('min_rate', self.min_rate),
+                'max_rate': settings.get('max_rate', self.max_rate),
+                # The bucket holds up to one second's worth of requests
+                'tokens': 1.0,
+                'updated': time.monotonic(),
+                'paused_until': 0.0,
+                'latency': None,
+                'failures': 0,
+                'circuit': 'closed',
+                'open_until': 0.0,
+                'trips': 0,
+                'probing': None,
+                'lock': asyncio.Lock(),
+                'requests': 0,
+                'errors': 0,
+            }
+            self.hosts[host] = state
+        return state
+
+    async def acquire(self, url: str) -> None:
+        """Wait for a request slot for the URL's host, or raise ``CircuitOpenError``."""
+        state = self._host(url)
+        async with state['lock']:
+            now = time.monotonic()
+            if state['circuit'] == 'open':
+                if now < state['open_until']:
+                    raise CircuitOpenError(f"Circuit open for {state['host']} for another {state['open_until'] - now:.0f}s")
+                state['circuit'] = 'half-open'
+                state['probing'] = None
+            if state['circuit'] == 'half-open':
+                # A probe whose outcome was never recorded is replaced after a minute
+                if state['probing'] is not None and now - state['probing'] < 60:
+                    raise CircuitOpenError(f"Circuit half-open for {state['host']}, waiting for the probe request")
+                state['probing'] = now
+
+            if now < state['paused_until']:
+                await asyncio.sleep(state['paused_until'] - now)
+
+            # Refill, then wait for a whole token if needed
+            now = time.monotonic()
+            capacity = max(1.0, state['rate'])
+            state['tokens'] = min(capacity, state['tokens'] + (now - state['updated']) * state['rate'])
+            state['updated'] = now
+            if state['tokens'] < 1.0:
+                await asyncio.sleep((1.0 - state['tokens']) / state['rate'])
+                state['tokens'] = 1.0
+                state['updated'] = time.monotonic()
+            state['tokens'] -= 1.0
+            state['requests'] += 1
+
+    def record(self, url: str, status: Optional[int] = None, latency: Optional[float] = None,
+               error: bool = False, retry_after: Optional[str] = None) -> None:
+        """Adapt the host's rate and circuit to a request outcome.
+
+        ``status`` is the HTTP status (None if no response), ``error`` marks connection errors
+        and timeouts, and ``retry_after`` is the response's Retry-After header, if any.
+        """
+        state = self._host(url)
+        failed = error or status == 429 or (status is not None and status >= 500)
+
+        if failed:
+            state['errors'] += 1
+            state['failures'] += 1
+            state['rate'] = max(state['min_rate'], state['rate'] * 0.5)
+            # Empty the bucket so the next request to the host waits a full interval at the new rate
+            state['tokens'] = 0.0
+            if retry_after and retry_after.strip().isdigit():
+                state['paused_until'] = time.monotonic() + int(retry_after.strip())
+
+            if state['circuit'] == 'half-open' or state['failures'] >= self.failure_threshold:
+                state['trips'] += 1
+                cooldown = self.cooldown * 2 ** (state['trips'] - 1)
+                state['circuit'] = 'open'
+                state['open_until'] = time.monotonic() + cooldown
+                state['probing'] = None
+                logger.warning(f"Circuit opened for {state['host']} after {state['failures']} failures, pausing {cooldown:.0f}s")
+            return
+
+        state['failures'] = 0
+        if state['circuit'] == 'half-open':
+            state['circuit'] = 'closed'
+            state['probing'] = None
+            state['trips'] = 0
+            logger.info(f"Circuit closed for {state['host']}")
+
+        if latency is not None:
+            smoothed = state['latency']
+            if smoothed is not None and latency > 2 * smoothed:
+                # Slowing responses are an early sign of overload
+                state['rate'] = max(state['min_rate'], state['rate'] * 0.8)
+            else:
+                state['rate'] = min(state['max_rate'], state['rate'] + 0.25)
+            state['latency'] = latency if smoothed is None else 0.8 * smoothed + 0.2 * latency
+        else:
+            state['rate'] = min(state['max_rate'], state['rate'] + 0.25)
+
+    def log_report(self) -> None:
+        """Log the current rate and error count of each host."""
+        for host, state in sorted(self.hosts.items()):
+            latency = f"{state['latency']:.2f}s" if state['latency'] is not None else 'n/a'
+            logger.info(
+                f"Host {host}: {state['requests']} requests, {state['errors']} errors, "
+                f"{state['rate']:.1f} req/s, {latency} latency, circuit {state['circuit']}"
+            )
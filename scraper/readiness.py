@@ -0,0 +1,112 @@
+from typing import Dict, Any, Callable, Awaitable
+import logging
+import time
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+class ReadinessWaiter:
+    """Event-driven waits for page readiness with adaptive timeouts and timing statistics.
+
+    Instead of sleeping a fixed time, callers wait for a selector, a page condition or a load
+    state. Each named wait gets a timeout of ``factor`` times its smoothed duration, kept between
+    ``min_timeout`` and ``max_timeout`` seconds, so slow pages get room while a missing element
+    does not stall a worker for long. Every wait is timed, and ``log_report`` shows the time spent
+    waiting next to the fixed sleeps that were replaced.
+    """
+
+    def __init__(self, min_timeout: float = 1.0, max_timeout: float = 10.0, factor: float = 4.0):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.factor = factor
+        # Per wait name: count, timeouts, total and longest duration, the smoothed duration of
+        # successful waits (for the adaptive timeout) and the time of the fixed sleeps replaced
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def timeout(self, name: str) -> float:
+        """Current timeout in seconds for a named wait."""
+        stats = self.stats.get(name)
+        if not stats or stats['average'] is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, stats['average'] * self.factor))
+
+    async def wait(self, name: str, condition: Callable[[float], Awaitable[Any]],
+                   replaced_sleep: float = 0.0, required: bool = False) -> bool:
+        """Run ``condition`` with the adaptive timeout (in seconds) and record how long it took.
+
+        Returns False if the wait timed out. A ``required`` wait that times out is given the rest
+        of ``max_timeout`` before the timeout is re-raised.
+        """
+        stats = self.stats.setdefault(name, {
+            'count': 0, 'timeouts': 0, 'total': 0.0, 'longest': 0.0, 'average': None, 'replaced': 0.0
+        })
+        timeout = self.timeout(name)
+        started = time.monotonic()
+        try:
+            try:
+                await condition(timeout)
+            except PlaywrightTimeoutError:
+                if not required or timeout >= self.max_timeout:
+                    raise
+                await condition(self.max_timeout - timeout)
+            timed_out = False
+        except PlaywrightTimeoutError:
+            timed_out = True
+            if required:
+                stats['timeouts'] += 1
+                raise
+        finally:
+            elapsed = time.monotonic() - started
+            stats['count'] += 1
+            stats['total'] += elapsed
+            stats['longest'] = max(stats['longest'], elapsed)
+            stats['replaced'] += replaced_sleep
+
+        if timed_out:
+            stats['timeouts'] += 1
+            logger.debug(f"Readiness wait '{name}' timed out after {elapsed:.2f}s")
+        else:
+            average = stats['average']
+            stats['average'] = elapsed if average is None else 0.8 * average + 0.2 * elapsed
+        return not timed_out
+
+    async def for_selector(self, page: Page, selector: str, name: str, state: str = 'attached',
+                           replaced_sleep: float = 0.0, required: bool = False) -> bool:
+        """Wait until an element matching ``selector`` reaches ``state``."""
+        return await self.wait(
+            name,
+            lambda timeout: page.wait_for_selector(selector, state=state, timeout=timeout * 1000),
+            replaced_sleep,
+            required
+        )
+
+    async def for_function(self, page: Page, expression: str, name: str, arg: Any = None,
+                           replaced_sleep: float = 0.0, required: bool = False) -> bool:
+        """Wait until a JavaScript expression evaluated in the page returns a truthy value."""
+        return await self.wait(
+            name,
+            lambda timeout: page.wait_for_function(expression, arg=arg, timeout=timeout * 1000),
+            replaced_sleep,
+            required
+        )
+
+    async def for_load_state(self, page: Page, name: str, state: str = 'networkidle',
+                             replaced_sleep: float = 0.0, required: bool = False) -> bool:
+        """Wait until the page reaches a load state such as 'networkidle'."""
+        return await self.wait(
+            name,
+            lambda timeout: page.wait_for_load_state(state, timeout=timeout * 1000),
+            replaced_sleep,
+            required
+        )
+
+    def log_report(self) -> None:
+        """Log the time spent in each kind of wait and the time saved against fixed sleeps."""
+        for name, stats in sorted(self.stats.items()):
+            message = (
+                f"Wait '{name}': {stats['count']} waits, {stats['total']:.1f}s total, "
+                f"{stats['total'] / stats['count']:.2f}s mean, {stats['longest']:.2f}s longest, {stats['timeouts']} timeouts"
+            )
+            if stats['replaced']:
+                message += f", {stats['replaced'] - stats['total']:.1f}s saved against fixed sleeps"
+            logger.info(message)
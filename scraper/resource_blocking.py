@@ -0,0 +1,79 @@
+from typing import Optional, Dict, Iterable, List
+from urllib.parse import urlparse
+import fnmatch
+import logging
+from playwright.async_api import BrowserContext, Route
+
+logger = logging.getLogger(__name__)
+
+# Subresources the scrapers never read; image URLs are taken from attributes and downloaded separately
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'stylesheet', 'media'})
+
+# Third-party analytics, ads and tracking hosts (subdomains included)
+TRACKER_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'googleadservices.com',
+    'googlesyndication.com',
+    'doubleclick.net',
+    'facebook.net',
+    'facebook.com',
+    'hotjar.com',
+    'clarity.ms',
+    'bing.com',
+    'tiktok.com',
+    'smartlook.com',
+    'yandex.ru',
+    'criteo.com',
+    'adform.net',
+    'gemius.pl',
+)
+
+class ResourceBlocker:
+    """Aborts browser requests for subresources a scraper does not need.
+
+    Installed on a browser context with ``context.route``, it aborts image, font, stylesheet and
+    media requests as well as any request to known analytics and tracking hosts. URLs matching one
+    of the ``allowlist`` glob patterns are always let through, so each scraper can keep the few
+    resources its pages need to render.
+    """
+
+    def __init__(self, allowlist: Iterable[str] = (), blocked_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+                 tracker_hosts: Iterable[str] = TRACKER_HOSTS):
+        self.allowlist: List[str] = list(allowlist)
+        self.blocked_types = frozenset(blocked_types)
+        self.tracker_hosts = tuple(tracker_hosts)
+        self.allowed = 0
+        self.blocked: Dict[str, int] = {}
+
+    async def install(self, context: BrowserContext) -> None:
+        """Route every request of the context through the blocking policy."""
+        await context.route('**/*', self._handle)
+        logger.info(f"Blocking {', '.join(sorted(self.blocked_types))} and tracker requests "
+                    f"({len(self.allowlist)} allowlist patterns)")
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """Why a request would be blocked, or None if it is allowed."""
+        if any(fnmatch.fnmatch(url, pattern) for pattern in self.allowlist):
+            return None
+        host = urlparse(url).hostname or ''
+        if any(host == tracker or host.endswith('.' + tracker) for tracker in self.tracker_hosts):
+            return 'tracker'
+        if resource_type in self.blocked_types:
+            return resource_type
+        return None
+
+    async def _handle(self, route: Route) -> None:
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type)
+        if reason:
+            self.blocked[reason] = self.blocked.get(reason, 0) + 1
+            await route.abort('blockedbyclient')
+        else:
+            self.allowed += 1
+            await route.continue_()
+
+    def log_report(self) -> None:
+        """Log how many requests were allowed and blocked."""
+        blocked = ', '.join(f"{count} {reason}" for reason, count in sorted(self.blocked.items())) or 'none'
+        logger.info(f"Browser requests: {self.allowed} allowed, blocked: {blocked}")
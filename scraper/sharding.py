@@ -0,0 +1,109 @@
+from typing import Optional, Dict, Any, List, Type
+import logging
+import asyncio
+import inspect
+import multiprocessing
+import os
+from jsonl_writer import JsonlWriter, read_jsonl, COMPRESSION_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+def shard_path(path: str, shard_index: int) -> str:
+    """Per-shard variant of a file path, e.g. ``products.jsonl.gz`` -> ``products.shard2.jsonl.gz``."""
+    suffix = next((suffix for suffix in COMPRESSION_SUFFIXES.values() if suffix and path.endswith(suffix)), '')
+    root, ext = os.path.splitext(path[:len(path) - len(suffix)])
+    return f"{root}.shard{shard_index}{ext}{suffix}"
+
+def _run_shard(scraper_class: Type, scraper_kwargs: Dict[str, Any], shard_index: int, shard_count: int) -> None:
+    """Entry point of a shard process: crawl this shard's listing pages with its own clients."""
+    # Tell the shards apart in the shared console output
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter(f'%(asctime)s - [shard {shard_index}] %(levelname)s - %(message)s'))
+
+    kwargs = dict(scraper_kwargs)
+    for key in ('state_path', 'checkpoint_path', 'dead_letter_path'):
+        kwargs[key] = shard_path(kwargs[key], shard_index)
+    # The shards share the per-host request rate, so together they stay within the configured limits
+    parameters = inspect.signature(scraper_class).parameters
+    for key in ('request_rate', 'max_request_rate'):
+        if key in parameters:
+            kwargs[key] = kwargs.get(key, parameters[key].default) / shard_count
+    scraper = scraper_class(**kwargs, shard_index=shard_index, shard_count=shard_count)
+    asyncio.run(scraper.scrape_products())
+
+async def run_sharded(scraper_class: Type, scraper_kwargs: Dict[str, Any], shard_count: int) -> None:
+    """Crawl with ``shard_count`` worker processes and merge their results.
+
+    Listing pages are split across the shards by page number; every shard runs its own browser
+    or HTTP client, PocketBase client, crawl state, checkpoint and dead-letter file, and gets an
+    equal share of the per-host request rate. The category
+    is resolved once up front so shards don't race to create it. When all shards have finished,
+    their checkpoints are merged into the main checkpoint, keeping one record per product URL,
+    and their dead-letter files are appended to the main one.
+    """
+    coordinator = scraper_class(**scraper_kwargs)
+    try:
+        await coordinator.authenticate_pocketbase()
+        await coordinator.get_category_id()
+    finally:
+        await coordinator.pb.close()
+
+    context = multiprocessing.get_context('spawn')
+    processes: List[multiprocessing.Process] = []
+    for shard_index in range(shard_count):
+        process = context.Process(
+            target=_run_shard,
+            args=(scraper_class, scraper_kwargs, shard_index, shard_count),
+            name=f"shard-{shard_index}"
+        )
+        process.start()
+        processes.append(process)
+    logger.info(f"Started {shard_count} shard processes")
+
+    for process in processes:
+        await asyncio.to_thread(process.join)
+    failed = [process.name for process in processes if process.exitcode != 0]
+    if failed:
+        logger.error(f"Shards failed: {', '.join(failed)}; run again with --resume to continue them")
+
+    merge_shard_results(
+        scraper_kwargs['checkpoint_path'],
+        scraper_kwargs.get('checkpoint_compression'),
+        scraper_kwargs['dead_letter_path'],
+        shard_count
+    )
+
+def merge_shard_results(checkpoint_path: str, compression: Optional[str], dead_letter_path: str, shard_count: int) -> None:
+    """Merge the shard checkpoints by product URL and collect the shard dead-letter files."""
+    suffix = COMPRESSION_SUFFIXES[compression]
+    paths = [shard_path(checkpoint_path, shard_index) for shard_index in range(shard_count)]
+    paths = [path if path.endswith(suffix) else path + suffix for path in paths]
+    paths = [path for path in paths if os.path.exists(path)]
+
+    # First pass: find the position of the latest record of every URL, so resumed shards win
+    latest: Dict[Any, Any] = {}
+    total = 0
+    for path in paths:
+        for position, record in enumerate(read_jsonl(path, compression)):
+            latest[record.get('url')] = (path, position)
+            total += 1
+
+    # Second pass: stream the latest records into the merged checkpoint
+    merged = JsonlWriter(checkpoint_path, compression=compression)
+    try:
+        for path in paths:
+            for position, record in enumerate(read_jsonl(path, compression)):
+                if latest.get(record.get('url')) == (path, position):
+                    merged.write(record)
+    finally:
+        merged.close()
+    duplicates = total - len(latest)
+    logger.info(f"Merged {len(latest)} products from {shard_count} shards ({duplicates} duplicates dropped)")
+
+    with open(dead_letter_path, 'a', encoding='utf-8') as dead_letters:
+        for shard_index in range(shard_count):
+            path = shard_path(dead_letter_path, shard_index)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    dead_letters.write(f.read())
+                os.remove(path)
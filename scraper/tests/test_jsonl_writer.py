@@ -0,0 +1,64 @@
+import gzip
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from jsonl_writer import JsonlWriter, read_jsonl, ZSTD_AVAILABLE
+
+CODECS = [
+    'gzip',
+    pytest.param('zstd', marks=pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard is not installed")),
+]
+
+def crashed_checkpoint(tmp_path, compression, count):
+    """Write and sync ``count`` records, then keep a copy of the file as a crash would leave it."""
+    writer = JsonlWriter(str(tmp_path / 'live.jsonl'), compression=compression)
+    for i in range(count):
+        writer.write({'url': f'https://example.com/{i}', 'i': i})
+    writer.sync()
+    crashed = str(tmp_path / 'crashed.jsonl') + os.path.splitext(writer.path)[1]
+    shutil.copyfile(writer.path, crashed)
+    writer.close()
+    return crashed
+
+def decompress_strictly(path, compression):
+    """Read a file the way zcat/zstdcat do, failing on any damaged frame."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    import zstandard
+    reader = zstandard.ZstdDecompressor().stream_reader(data, read_across_frames=True)
+    return reader.read()
+
+@pytest.mark.parametrize('compression', CODECS)
+def test_read_crashed_checkpoint(tmp_path, compression):
+    path = crashed_checkpoint(tmp_path, compression, 60)
+    assert [record['i'] for record in read_jsonl(path, compression)] == list(range(60))
+
+@pytest.mark.parametrize('compression', CODECS)
+def test_resume_after_crash(tmp_path, compression):
+    path = crashed_checkpoint(tmp_path, compression, 60)
+
+    writer = JsonlWriter(path, compression=compression, append=True)
+    for i in range(60, 70):
+        writer.write({'url': f'https://example.com/{i}', 'i': i})
+    writer.close()
+
+    assert [record['i'] for record in read_jsonl(path, compression)] == list(range(70))
+    assert decompress_strictly(path, compression).count(b'\n') == 70
+
+@pytest.mark.parametrize('compression', CODECS)
+def test_resume_intact_checkpoint(tmp_path, compression):
+    writer = JsonlWriter(str(tmp_path / 'done.jsonl'), compression=compression)
+    writer.write({'i': 0})
+    writer.close()
+
+    resumed = JsonlWriter(writer.path, compression=compression, append=True)
+    resumed.write({'i': 1})
+    resumed.close()
+
+    assert [record['i'] for record in read_jsonl(writer.path, compression)] == [0, 1]
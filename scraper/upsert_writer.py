@@ -0,0 +1,140 @@
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Set
+from datetime import datetime
+import logging
+import asyncio
+import json
+from pocketbase_client import AsyncPocketBase
+
+logger = logging.getLogger(__name__)
+
+# Called with the saved record after a successful write, e.g. to upload the record's images
+SuccessCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+class UpsertWriter:
+    """Buffers record creates and updates and writes them to PocketBase in batches.
+
+    Records are flushed once ``batch_size`` of them are buffered or ``max_delay`` seconds after
+    the first one was added. Each batch is sent with ``AsyncPocketBase.batch`` and every record
+    gets its own result: successes run the record's callback, failures are appended to the
+    dead-letter JSONL file so the rest of the run is unaffected.
+
+    At most ``max_pending`` records with a callback (twice ``batch_size`` by default) may be
+    buffered or running their callback; ``upsert`` waits for a slot, so callers can't run ahead
+    of slow callbacks such as image uploads.
+    """
+
+    def __init__(self, pb: AsyncPocketBase, collection: str, batch_size: int = 50,
+                 max_delay: float = 2.0, dead_letter_path: str = 'dead_letter.jsonl',
+                 max_pending: Optional[int] = None):
+        self.pb = pb
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self.dead_letter_path = dead_letter_path
+
+        self.written = 0
+        self.failed = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._callbacks: Set[asyncio.Task] = set()
+        self._slots = asyncio.Semaphore(max(1, max_pending or 2 * self.batch_size))
+
+    async def upsert(self, body: Dict[str, Any], record_id: Optional[str] = None,
+                     on_success: Optional[SuccessCallback] = None) -> None:
+        """Buffer a create (no ``record_id``) or an update, flushing if the batch is full.
+
+        Waits while ``max_pending`` records with callbacks are outstanding.
+        """
+        if on_success:
+            if self._slots.locked():
+                # Buffered records hold slots too; write them so their callbacks can finish
+                await self.flush()
+            await self._slots.acquire()
+        self._buffer.append({'body': body, 'record_id': record_id, 'on_success': on_success})
+
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        """Flush whatever is buffered once the oldest record has waited ``max_delay`` seconds."""
+        await asyncio.sleep(self.max_delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write all buffered records."""
+        if self._timer and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+
+        async with self._flush_lock:
+            entries, self._buffer = self._buffer, []
+            if not entries:
+                return
+
+            path = f'/api/collections/{self.collection}/records'
+            requests = [
+                {
+                    'method': 'PATCH' if entry['record_id'] else 'POST',
+                    'url': f"{path}/{entry['record_id']}" if entry['record_id'] else path,
+                    'body': entry['body']
+                }
+                for entry in entries
+            ]
+            try:
+                results = await self.pb.batch(requests)
+            except Exception as e:
+                logger.error(f"Batch of {len(entries)} {self.collection} records failed: {e}")
+                results = [{'status': getattr(e, 'status', 0), 'body': {'message': str(e)}}] * len(entries)
+
+        succeeded = 0
+        for entry, result in zip(entries, results):
+            if 200 <= result['status'] < 300:
+                succeeded += 1
+                if entry['on_success']:
+                    task = asyncio.create_task(self._run_callback(entry['on_success'], result['body']))
+                    self._callbacks.add(task)
+                    task.add_done_callback(self._callbacks.discard)
+            else:
+                if entry['on_success']:
+                    self._slots.release()
+                self.dead_letter(entry['body'], entry['record_id'], result['status'], result['body'])
+
+        self.written += succeeded
+        logger.info(f"Wrote batch of {len(entries)} {self.collection} records: {succeeded} succeeded, {len(entries) - succeeded} failed")
+
+    async def _run_callback(self, callback: SuccessCallback, record: Dict[str, Any]) -> None:
+        """Run a success callback without letting its errors escape the task."""
+        try:
+            await callback(record)
+        except Exception as e:
+            logger.error(f"Error after saving {self.collection} record {record.get('id')}: {e}")
+        finally:
+            self._slots.release()
+
+    def dead_letter(self, body: Dict[str, Any], record_id: Optional[str], status: int, error: Any) -> None:
+        """Append a record that could not be written to the dead-letter file."""
+        self.failed += 1
+        logger.error(f"Failed to write {self.collection} record {record_id or body.get('slug', '')} (status {status}): {error}")
+        try:
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'time': datetime.now().isoformat(),
+                    'collection': self.collection,
+                    'record_id': record_id,
+                    'status': status,
+                    'error': error,
+                    'body': body
+                }, ensure_ascii=False, default=str) + '\n')
+        except OSError as e:
+            logger.error(f"Could not write to dead-letter file {self.dead_letter_path}: {e}")
+
+    async def close(self) -> None:
+        """Flush the remaining records and wait for their callbacks to finish."""
+        await self.flush()
+        while self._callbacks:
+            await asyncio.gather(*list(self._callbacks))
+        logger.info(f"{self.collection}: {self.written} records written, {self.failed} sent to {self.dead_letter_path}")
@@ -0,0 +1,133 @@
+from typing import Optional, Dict, Any, List, Set, Tuple
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+class SlugMatcher:
+    """Token inverted index that matches image file slugs to product slugs.
+
+    Slugs are split into their hyphen-separated tokens and every token points to the slugs that
+    contain it. A lookup only scores the slugs sharing a token with the query, starting from the
+    rarest tokens, so it does not scan the whole catalogue. Candidates are scored by IDF-weighted
+    token overlap, so a shared rare token such as a model number counts far more than a shared
+    brand name. The score mostly weighs Jaccard similarity, with a smaller share of containment (the
+    overlap relative to the shorter slug), so an image named after a shortened product name still
+    matches without a bare brand name matching everything that contains it. A match also needs
+    ``min_shared_tokens`` tokens in common with the image.
+
+    A best candidate below ``min_score`` is recorded in ``rejected``, and one whose score is within
+    ``ambiguity_margin`` of the runner-up in ``ambiguous``; neither is returned as a match, both
+    are listed by ``log_report``.
+    """
+
+    def __init__(self, min_score: float = 0.5, ambiguity_margin: float = 0.05, common_share: float = 0.2,
+                 containment_weight: float = 0.3, min_shared_tokens: int = 2):
+        self.min_score = min_score
+        self.ambiguity_margin = ambiguity_margin
+        self.containment_weight = containment_weight
+        self.min_shared_tokens = min_shared_tokens
+        # Tokens in more than this share of slugs are only used when the query has no rarer token
+        self.common_share = common_share
+
+        self.products: Dict[str, Dict[str, Any]] = {}
+        self.tokens: Dict[str, Set[str]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        self.ambiguous: List[Tuple[str, List[Tuple[str, float]]]] = []
+        self.rejected: List[Tuple[str, List[Tuple[str, float]]]] = []
+
+    def add(self, slug: str, product: Dict[str, Any]) -> None:
+        """Index a product under a slug; a slug added again points to the latest product."""
+        if not slug:
+            return
+        self.products[slug] = product
+        if slug in self.tokens:
+            return
+        tokens = set(self._tokenize(slug))
+        self.tokens[slug] = tokens
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(slug)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def _tokenize(self, slug: str) -> List[str]:
+        return [token for token in slug.split('-') if token]
+
+    def _idf(self, token: str) -> float:
+        return math.log(1 + len(self.tokens) / (1 + len(self.postings.get(token, ()))))
+
+    def rank(self, image_slug: str, limit: int = 3) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` ``(slug, score)`` candidates for an image slug, best first."""
+        query = set(self._tokenize(image_slug))
+        known = sorted((token for token in query if token in self.postings), key=lambda t: len(self.postings[t]))
+        if not known:
+            return []
+
+        common_limit = max(50, len(self.tokens) * self.common_share)
+        rare = [token for token in known if len(self.postings[token]) <= common_limit]
+
+        shared: Dict[str, float] = {}
+        for token in rare or known[:1]:
+            weight = self._idf(token)
+            for slug in self.postings[token]:
+                shared[slug] = shared.get(slug, 0.0) + weight
+        # Common tokens only add to the score of candidates found through the rare ones
+        if rare:
+            for token in known[len(rare):]:
+                weight = self._idf(token)
+                for slug in shared:
+                    if token in self.tokens[slug]:
+                        shared[slug] += weight
+
+        query_weight = sum(self._idf(token) for token in query)
+        scored = []
+        for slug, overlap in shared.items():
+            slug_weight = sum(self._idf(token) for token in self.tokens[slug])
+            union = query_weight + slug_weight - overlap
+            jaccard = overlap / union if union else 0.0
+            containment = overlap / min(query_weight, slug_weight) if min(query_weight, slug_weight) else 0.0
+            score = (1 - self.containment_weight) * jaccard + self.containment_weight * containment
+            scored.append((slug, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def match(self, image_slug: str) -> Optional[Tuple[str, Dict[str, Any], float]]:
+        """Return ``(slug, product, score)`` of the best match for an image slug, or None.
+
+        An exact slug wins with a score of 1.0. Rejected and ambiguous matches return None.
+        """
+        if image_slug in self.products:
+            return image_slug, self.products[image_slug], 1.0
+
+        candidates = self.rank(image_slug)
+        if not candidates:
+            return None
+        slug, score = candidates[0]
+        shared_tokens = len(set(self._tokenize(image_slug)) & self.tokens[slug])
+        if score < self.min_score or shared_tokens < self.min_shared_tokens:
+            self.rejected.append((image_slug, candidates))
+            return None
+        if len(candidates) > 1 and score - candidates[1][1] <= self.ambiguity_margin:
+            self.ambiguous.append((image_slug, candidates))
+            return None
+        return slug, self.products[slug], score
+
+    def log_report(self) -> None:
+        """Log the images whose best match was close to another candidate or below ``min_score``."""
+        if not self.ambiguous:
+            logger.info("No ambiguous image matches")
+        else:
+            logger.warning(f"{len(self.ambiguous)} images were not uploaded because their best matches are ambiguous, check these products:")
+            for image_slug, candidates in self.ambiguous:
+                ranked = ', '.join(f"{slug} ({score:.2f})" for slug, score in candidates)
+                logger.warning(f"  {image_slug} -> {ranked}")
+
+        if self.rejected:
+            logger.warning(
+                f"{len(self.rejected)} images were not matched, their best candidates scored below {self.min_score} "
+                f"or shared fewer than {self.min_shared_tokens} tokens:"
+            )
+            for image_slug, candidates in self.rejected:
+                ranked = ', '.join(f"{slug} ({score:.2f})" for slug, score in candidates)
+                logger.warning(f"  {image_slug} -> {ranked}")
@@ -1,11 +1,14 @@
 import os
 import sys
+import asyncio
 import logging
 import tempfile
-import requests
 import json
+import aiohttp
 from dotenv import load_dotenv
-from pocketbase import PocketBase
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scraper'))
+from pocketbase_client import AsyncPocketBase
 
 # Configure logging
 logging.basicConfig(
@@ -14,7 +17,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def test_create_product_with_image():
+async def test_create_product_with_image():
     """Test creating a new product with an image attachment"""
     # Load environment variables
     load_dotenv()
@@ -23,9 +26,14 @@ def test_create_product_with_image():
     logger.info(f"PocketBase URL: {pb_url}")
     
     # Initialize PocketBase
-    pb_client = PocketBase(pb_url)
-    logger.info("PocketBase client initialized")
+    async with AsyncPocketBase(pb_url) as pb:
+        logger.info("PocketBase client initialized")
+        await _create_product_with_image(pb)
     
+    logger.info("Test completed")
+
+async def _create_product_with_image(pb: AsyncPocketBase):
+    """Authenticate, download a test image and attach it to a new product."""
     # Authenticate with PocketBase
     try:
         email = os.getenv('POCKETBASE_ADMIN_EMAIL')
@@ -35,7 +43,7 @@ def test_create_product_with_image():
             raise ValueError("PocketBase admin credentials not found in environment variables")
         
         logger.info(f"Attempting to authenticate with email: {email}")
-        pb_client.admins.auth_with_password(email, password)
+        await pb.auth_with_password(email, password)
         logger.info("Successfully authenticated with PocketBase")
     except Exception as e:
         logger.error(f"Failed to authenticate with PocketBase: {str(e)}")
@@ -47,15 +55,17 @@ def test_create_product_with_image():
         test_image_url = "https://via.placeholder.com/300.jpg"
         logger.info(f"Downloading test image from: {test_image_url}")
         
-        response = requests.get(test_image_url)
-        if response.status_code != 200:
-            logger.error(f"Failed to download test image. Status code: {response.status_code}")
-            return
+        async with aiohttp.ClientSession() as session:
+            async with session.get(test_image_url) as response:
+                if response.status != 200:
+                    logger.error(f"Failed to download test image. Status code: {response.status}")
+                    return
+                content = await response.read()
         
         # Save the image to a temporary file
         temp_file_path = os.path.join(temp_dir, "test_image.jpg")
         with open(temp_file_path, 'wb') as f:
-            f.write(response.content)
+            f.write(content)
         logger.info(f"Test image saved to: {temp_file_path}")
         
         # Create a new test product
@@ -80,36 +90,22 @@ def test_create_product_with_image():
             
             # Create the product first without the image
             logger.info("Creating product record...")
-            result = pb_client.collection('products').create(product_data)
-            product_id = result.id
+            result = await pb.create('products', product_data)
+            product_id = result['id']
             logger.info(f"Created product with ID: {product_id}")
             
             # Now upload the image as a separate step
             logger.info("Uploading product thumbnail...")
             with open(temp_file_path, 'rb') as f:
-                files = {
-                    'image': ('test_image.jpg', f, 'image/jpeg')
-                }
-                
-                # Use the direct API approach
-                update_result = pb_client.send(f'/api/collections/products/records/{product_id}', {
-                    'method': 'PATCH',
-                    'files': files,
-                })
+                files = [('image', 'test_image.jpg', f, 'image/jpeg')]
+                update_result = await pb.update('products', product_id, files=files)
                 logger.info(f"Thumbnail upload response: {update_result}")
             
             # Upload an additional image to the gallery
             logger.info("Uploading image to gallery...")
             with open(temp_file_path, 'rb') as f:
-                files = {
-                    'images[]': ('gallery_image.jpg', f, 'image/jpeg')
-                }
-                
-                # Use the direct API approach
-                update_result = pb_client.send(f'/api/collections/products/records/{product_id}', {
-                    'method': 'PATCH',
-                    'files': files,
-                })
+                files = [('images', 'gallery_image.jpg', f, 'image/jpeg')]
+                update_result = await pb.update('products', product_id, files=files)
                 logger.info(f"Gallery upload response: {update_result}")
             
             logger.info(f"Test product created successfully with ID: {product_id}")
@@ -117,8 +113,6 @@ def test_create_product_with_image():
             
         except Exception as e:
             logger.error(f"Error creating test product: {str(e)}")
-    
-    logger.info("Test completed")
 
 if __name__ == "__main__":
-    test_create_product_with_image() 
\ No newline at end of file
+    asyncio.run(test_create_product_with_image()) 
\ No newline at end of file
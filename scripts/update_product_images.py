@@ -1,11 +1,19 @@
 import os
+import sys
 import asyncio
-from pocketbase import PocketBase
 from dotenv import load_dotenv
 import logging
 import re
+import time
+import argparse
 import tempfile
 from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+
+# The async PocketBase client lives next to the scrapers
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scraper'))
+from pocketbase_client import AsyncPocketBase
+from slug_matcher import SlugMatcher
 
 # Configure logging
 logging.basicConfig(
@@ -15,24 +23,35 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class ProductImageUpdater:
-    def __init__(self):
+    def __init__(self, concurrency: int = 8, images_dir: Optional[str] = None):
+        """``concurrency`` limits the products whose images are read and uploaded at once; ``images_dir`` holds the
+        ``<slug>.webp`` files (a temporary directory by default)."""
+        self.concurrency = max(1, concurrency)
+        
         # Initialize PocketBase
         load_dotenv()
         logger.info("Environment variables loaded")
         logger.info(f"PocketBase URL: {os.getenv('NEXT_PUBLIC_POCKETBASE_URL')}")
         
-        self.pb_client = PocketBase(os.getenv('NEXT_PUBLIC_POCKETBASE_URL', 'http://127.0.0.1:8090'))
+        # Uploads share the client's keep-alive connection pool
+        self.pb = AsyncPocketBase(
+            os.getenv('NEXT_PUBLIC_POCKETBASE_URL', 'http://127.0.0.1:8090'),
+            concurrency=self.concurrency
+        )
         logger.info("PocketBase client initialized")
         
-        self.authenticate_pocketbase()
-        logger.info("PocketBase authentication completed")
-        
-        # Use Python's tempfile module for temporary storage
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.images_dir = Path(self.temp_dir.name)
+        if images_dir:
+            self.images_dir = Path(images_dir)
+        else:
+            # Use Python's tempfile module for temporary storage
+            self.temp_dir = tempfile.TemporaryDirectory()
+            self.images_dir = Path(self.temp_dir.name)
         logger.info(f"Images directory: {self.images_dir}")
+        
+        # Upload progress, reported periodically while the uploads run
+        self.progress = {'total': 0, 'done': 0, 'failed': 0, 'bytes': 0, 'started': 0.0, 'reported': 0.0}
 
-    def authenticate_pocketbase(self) -> None:
+    async def authenticate_pocketbase(self) -> None:
         """Authenticate with PocketBase."""
         try:
             email = os.getenv('POCKETBASE_ADMIN_EMAIL')
@@ -43,7 +62,7 @@ class ProductImageUpdater:
             
             logger.info(f"Attempting to authenticate with email: {email}")
             
-            self.pb_client.admins.auth_with_password(email, password)
+            await self.pb.auth_with_password(email, password)
             logger.info("Successfully authenticated with PocketBase")
         except Exception as e:
             logger.error(f"Failed to authenticate with PocketBase: {str(e)}")
@@ -52,96 +71,124 @@ class ProductImageUpdater:
     async def update_product_images(self):
         """Update all products with their corresponding images."""
         try:
-            # Get all products from nesiojami source
-            products_result = self.pb_client.collection('products').get_list(
-                query_params={
-                    'filter': 'source = "nesiojami"',
-                    'page': 1,
-                    'perPage': 100
-                }
-            )
-
-            logger.info(f"Found {len(products_result.items)} products to update")
-
-            # Create a dictionary of products with slugified names as keys for faster lookup
-            products_dict = {}
-            for product in products_result.items:
-                # Access product data as a dictionary
-                product_data = vars(product)
-                product_name = product_data.get('name', '')
-                
-                # If name is not directly accessible, try to get it from the raw data
-                if not product_name and hasattr(product, 'collection_id'):
-                    product_name = product.collection_id
-                
-                # If still no name, try to access it as an attribute
-                if not product_name:
-                    product_name = getattr(product, 'name', '')
-                
-                if product_name:
-                    slug = self.generate_slug(product_name)
-                    products_dict[slug] = product
+            await self.authenticate_pocketbase()
+            logger.info("PocketBase authentication completed")
+
+            # Index all products from nesiojami source by slug as their pages arrive
+            matcher = SlugMatcher()
+            product_count = 0
+            async for product in self.iter_products():
+                product_count += 1
+                self.index_product(matcher, product)
+
+            logger.info(f"Found {product_count} products to update")
 
             # Get all image files from the product_images directory
             image_files = [f for f in os.listdir(self.images_dir) if f.endswith('.webp')]
             logger.info(f"Found {len(image_files)} image files in the product_images directory")
 
-            # Process each image file
+            # Match every image, then upload each product's images concurrently across products
+            matches_by_product: Dict[str, List[Tuple[str, str, str, float]]] = {}
+            products_by_id: Dict[str, Dict[str, Any]] = {}
             for image_file in image_files:
                 # Extract the slug from the image filename (remove .webp extension)
                 image_slug = image_file.rsplit('.', 1)[0]
-                image_path = os.path.join(self.images_dir, image_file)
                 
-                # Find matching product
-                if image_slug in products_dict:
-                    matching_product = products_dict[image_slug]
-                    try:
-                        # Read the image file
-                        with open(image_path, 'rb') as f:
-                            file_data = f.read()
-
-                        # Create form data for both image fields
-                        form = {
-                            'image': (image_file, file_data, 'image/webp'),
-                            'images[]': [(image_file, file_data, 'image/webp')]
-                        }
-
-                        # Update the product with the image
-                        self.pb_client.collection('products').update(matching_product.id, {}, form)
-                        logger.info(f"Successfully updated image for product: {image_slug}")
-                    except Exception as e:
-                        logger.error(f"Error updating image for product {image_slug}: {e}")
-                else:
-                    # Try a more flexible matching approach
-                    found_match = False
-                    for slug, product in products_dict.items():
-                        if slug in image_slug or image_slug in slug:
-                            try:
-                                # Read the image file
-                                with open(image_path, 'rb') as f:
-                                    file_data = f.read()
-
-                                # Create form data for both image fields
-                                form = {
-                                    'image': (image_file, file_data, 'image/webp'),
-                                    'images[]': [(image_file, file_data, 'image/webp')]
-                                }
-
-                                # Update the product with the image
-                                self.pb_client.collection('products').update(product.id, {}, form)
-                                logger.info(f"Successfully updated image for product with partial match: {image_slug} -> {slug}")
-                                found_match = True
-                                break
-                            except Exception as e:
-                                logger.error(f"Error updating image for product with partial match {image_slug} -> {slug}: {e}")
-                    
-                    if not found_match:
-                        logger.warning(f"No matching product found for image: {image_file}")
+                # Find the best matching product; ambiguous matches are only reported
+                match = matcher.match(image_slug)
+                if not match:
+                    logger.warning(f"No unambiguous matching product found for image: {image_file}")
+                    continue
+                
+                slug, product, score = match
+                products_by_id[product['id']] = product
+                matches_by_product.setdefault(product['id'], []).append((image_file, image_slug, slug, score))
+
+            total = sum(len(matches) for matches in matches_by_product.values())
+            self.progress.update(total=total, started=time.monotonic(), reported=time.monotonic())
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def run(product_id: str) -> None:
+                async with semaphore:
+                    await self.upload_product_images(products_by_id[product_id], matches_by_product[product_id])
 
+            await asyncio.gather(*(run(product_id) for product_id in matches_by_product))
+            self.log_progress(final=True)
+
+            matcher.log_report()
             logger.info("Image update process completed")
 
         except Exception as e:
             logger.error(f"Error updating product images: {e}")
+        finally:
+            await self.pb.close()
+
+    async def upload_product_images(self, product: Dict[str, Any], matches: List[Tuple[str, str, str, float]]) -> None:
+        """Read a product's matched image files off the event loop and upload them in one request.
+
+        ``matches`` are ``(image file, image slug, product slug, score)``. The best match becomes
+        the thumbnail and every image is added to the gallery; sending them together keeps two
+        images of the same product from overwriting each other's update.
+        """
+        matches = sorted(matches, key=lambda match: (-match[3], match[0]))
+        try:
+            file_data = await asyncio.gather(*(
+                asyncio.to_thread((self.images_dir / image_file).read_bytes)
+                for image_file, _, _, _ in matches
+            ))
+
+            # Create form data for both image fields
+            files = [('image', matches[0][0], file_data[0], 'image/webp')]
+            files += [
+                ('images', image_file, data, 'image/webp')
+                for (image_file, _, _, _), data in zip(matches, file_data)
+            ]
+
+            # Update the product with the images
+            await self.pb.update('products', product['id'], files=files)
+            self.progress['bytes'] += sum(len(data) for data in file_data)
+            for _, image_slug, slug, score in matches:
+                if slug == image_slug:
+                    logger.info(f"Successfully updated image for product: {image_slug}")
+                else:
+                    logger.info(f"Successfully updated image for product with partial match: {image_slug} -> {slug} (score {score:.2f})")
+        except Exception as e:
+            self.progress['failed'] += len(matches)
+            image_slugs = ', '.join(image_slug for _, image_slug, _, _ in matches)
+            logger.error(f"Error updating images {image_slugs} for product {product['id']}: {e}")
+        finally:
+            self.progress['done'] += len(matches)
+            self.log_progress()
+
+    def log_progress(self, final: bool = False, interval: float = 10.0) -> None:
+        """Log upload progress and throughput, at most every ``interval`` seconds unless final."""
+        now = time.monotonic()
+        if not final and now - self.progress['reported'] < interval:
+            return
+        self.progress['reported'] = now
+        elapsed = max(now - self.progress['started'], 1e-6)
+        logger.info(
+            f"Uploaded {self.progress['done']}/{self.progress['total']} images "
+            f"({self.progress['failed']} failed), {self.progress['done'] / elapsed:.1f} images/s, "
+            f"{self.progress['bytes'] / elapsed / (1024 * 1024):.2f} MB/s"
+        )
+
+    async def iter_products(self, per_page: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every nesiojami product page by page, with only the fields needed for matching."""
+        async for product in self.pb.iterate(
+            'products',
+            per_page=per_page,
+            params={'filter': 'source = "nesiojami"', 'fields': 'id,name,slug'}
+        ):
+            yield product
+
+    def index_product(self, matcher: SlugMatcher, product: Dict[str, Any]) -> None:
+        """Add a product under the slug of its name and under its stored slug."""
+        product_name = product.get('name', '')
+        if product_name:
+            matcher.add(self.generate_slug(product_name), product)
+        if product.get('slug') and product['slug'] not in matcher.products:
+            matcher.add(product['slug'], product)
 
     def generate_slug(self, name: str) -> str:
         """Generate a URL-friendly slug from the product name."""
@@ -162,7 +209,21 @@ class ProductImageUpdater:
             self.temp_dir.cleanup()
 
 async def main():
-    updater = ProductImageUpdater()
+    parser = argparse.ArgumentParser(description="Attach product images from a directory of <slug>.webp files")
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help="Products whose images are read and uploaded at once (default: 8)"
+    )
+    parser.add_argument(
+        '--images-dir',
+        default=None,
+        help="Directory with the .webp images (default: an empty temporary directory)"
+    )
+    args = parser.parse_args()
+    
+    updater = ProductImageUpdater(concurrency=args.concurrency, images_dir=args.images_dir)
     await updater.update_product_images()
 
 if __name__ == "__main__":
@@ -1,41 +1,200 @@
 import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 import json
 from urllib.parse import urljoin
-import hashlib
-from PIL import Image
-from io import BytesIO
+from PIL import Image, features
+import threading
+from concurrent.futures import ProcessPoolExecutor, Future
+
+# The image cache lives next to the other scrapers
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'scraper'))
+from image_cache import ImageCache
+from pocketbase.client import FileUpload
+
+# Widths of the responsive renditions served to the storefront
+RENDITION_WIDTHS = (200, 400, 800, 1600)
+
+def rendition_widths(source_width, widths=RENDITION_WIDTHS):
+    """Widths of the renditions of an image ``source_width`` pixels wide; images are never upscaled"""
+    targets = {width for width in widths if width < source_width}
+    if source_width <= max(widths):
+        # Keep a full-width copy of images narrower than the largest size
+        targets.add(source_width)
+    return sorted(targets, reverse=True)
+
+def rendition_formats(avif=False):
+    formats = [('webp', 'WEBP', {'quality': 80, 'method': 4})]
+    if avif:
+        formats.append(('avif', 'AVIF', {'quality': 60}))
+    return formats
+
+def rendition_names(digest, source_width, widths=RENDITION_WIDTHS, avif=False):
+    """File names of the renditions of an image content hash, widest first"""
+    return [f"{digest[:16]}_{width}.{extension}"
+            for width in rendition_widths(source_width, widths)
+            for extension, _, _ in rendition_formats(avif)]
+
+def _save_atomic(img, filepath, format, **params):
+    # Rename into place so a partial file is never served
+    temp_path = f"{filepath}.{os.getpid()}.tmp"
+    img.save(temp_path, format, **params)
+    os.replace(temp_path, filepath)
+
+def optimize_image(source_path, filepath, max_size=(1920, 1080), quality=85,
+                   rendition_dir=None, digest=None, widths=RENDITION_WIDTHS, avif=False):
+    """Decode an image once and write the optimized JPEG and its renditions; runs in a worker process
+
+    With ``rendition_dir`` set, WebP (and, with ``avif``, AVIF) copies are written at each of
+    ``widths`` that is narrower than the image, named by the content hash ``digest`` so identical
+    images share them. Returns ``{'image': file name, 'renditions': [file names]}``.
+    """
+    with Image.open(source_path) as img:
+        # Let the JPEG decoder downscale while decoding, never below what the largest output needs
+        largest = max(max_size[0], max(widths)) if rendition_dir else max_size[0]
+        img.draft('RGB', (largest, max_size[1]))
+        img = img.convert('RGB')  # Convert to RGB format
+    
+    renditions = []
+    if rendition_dir:
+        # Each size is resized from the next larger one
+        resized = img
+        for width in rendition_widths(img.width, widths):
+            if width < resized.width:
+                resized = resized.resize((width, max(1, round(resized.height * width / resized.width))), Image.Resampling.LANCZOS)
+            for extension, format, params in rendition_formats(avif):
+                name = f"{digest[:16]}_{width}.{extension}"
+                _save_atomic(resized, os.path.join(rendition_dir, name), format, **params)
+                renditions.append(name)
+    
+    # Resize if too large
+    img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    
+    # Save with optimization
+    _save_atomic(img, filepath, 'JPEG', quality=quality, optimize=True)
+    return {'image': os.path.basename(filepath), 'renditions': sorted(renditions)}
 
 class ProductScraper:
-    def __init__(self, base_url):
+    def __init__(self, base_url, image_cache_dir=None, image_workers=None, image_queue_size=None,
+                 renditions=True, avif=False):
+        """Images are optimized by a pool of ``image_workers`` processes (one per core by default),
+        with at most ``image_queue_size`` images queued or in progress at once. ``renditions``
+        also writes responsive WebP sizes of every image, plus AVIF ones with ``avif``."""
         self.base_url = base_url
         self.session = requests.Session()
         self.image_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'product_images')
         os.makedirs(self.image_dir, exist_ok=True)
+        self.image_cache = ImageCache(
+            image_cache_dir or os.getenv('IMAGE_CACHE_DIR') or os.path.join(self.image_dir, '.cache')
+        )
+        self.rendition_dir = os.path.join(self.image_dir, 'renditions') if renditions else None
+        if self.rendition_dir:
+            os.makedirs(self.rendition_dir, exist_ok=True)
+        self.avif = avif and features.check('avif')
+        if avif and not self.avif:
+            print("AVIF renditions need Pillow with AVIF support, writing WebP only")
+        self.image_workers = image_workers or os.cpu_count() or 1
+        self.image_pool = None
+        # Bounds the images waiting for a worker so downloads can't run far ahead of the pool
+        self.image_slots = threading.BoundedSemaphore(image_queue_size or self.image_workers * 2)
 
-    def download_and_optimize_image(self, image_url, product_id):
+    def close(self):
+        """Wait for queued image work and stop the worker processes"""
+        if self.image_pool:
+            self.image_pool.shutdown(wait=True)
+            self.image_pool = None
+
+    def fetch_image(self, image_url):
+        """Download an image through the image cache and return its SHA-256 digest"""
+        cached = self.image_cache.lookup(image_url)
+        if cached and self.image_cache.is_fresh(cached):
+            return cached['digest']
+
+        headers = self.image_cache.revalidation_headers(cached) if cached else {}
+        response = self.session.get(image_url, headers=headers, stream=True)
+        if response.status_code == 304 and cached:
+            self.image_cache.mark_revalidated(image_url)
+            return cached['digest']
+        if response.status_code != 200:
+            return None
+
+        writer = self.image_cache.writer(
+            image_url,
+            response.headers.get('content-type', ''),
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified')
+        )
         try:
-            response = requests.get(image_url)
-            if response.status_code == 200:
-                # Create unique filename based on URL
-                filename = f"{product_id}_{hashlib.md5(image_url.encode()).hexdigest()[:10]}.jpg"
-                filepath = os.path.join(self.image_dir, filename)
-
-                # Optimize image
-                img = Image.open(BytesIO(response.content))
-                img = img.convert('RGB')  # Convert to RGB format
-                
-                # Resize if too large
-                max_size = (1920, 1080)
-                img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                
-                # Save with optimization
-                img.save(filepath, 'JPEG', quality=85, optimize=True)
-                return filename
+            for chunk in response.iter_content(64 * 1024):
+                writer.write(chunk)
+        except Exception:
+            writer.abort()
+            raise
+        return writer.commit()
+
+    def existing_renditions(self, digest):
+        """Sorted rendition file names of an image if all of them were generated, else None"""
+        if not self.rendition_dir:
+            return []
+        # The renditions depend on the decoded width, which draft() may round down from the header's
+        source_path = self.image_cache.blob_path(digest)
+        with Image.open(source_path) as img:
+            img.draft('RGB', (max(1920, max(RENDITION_WIDTHS)), 1080))
+            source_width = img.size[0]
+        names = rendition_names(digest, source_width, avif=self.avif)
+        if not all(os.path.exists(os.path.join(self.rendition_dir, name)) for name in names):
             return None
+        return sorted(names)
+
+    def download_and_optimize_image(self, image_url, product_id):
+        """Download an image and queue its optimization, returning a future of
+        ``{'image', 'renditions'}`` file names (or None)"""
+        result = Future()
+        try:
+            digest = self.fetch_image(image_url)
+            if not digest:
+                result.set_result(None)
+                return result
+
+            # Name the file by its content so identical images are only optimized once
+            filename = f"{product_id}_{digest[:10]}.jpg"
+            filepath = os.path.join(self.image_dir, filename)
+            if os.path.exists(filepath):
+                renditions = self.existing_renditions(digest)
+                if renditions is not None:
+                    result.set_result({'image': filename, 'renditions': renditions})
+                    return result
+
+            if self.image_pool is None:
+                self.image_pool = ProcessPoolExecutor(max_workers=self.image_workers)
+            # Blocks while the queue is full
+            self.image_slots.acquire()
+            try:
+                future = self.image_pool.submit(
+                    optimize_image,
+                    str(self.image_cache.blob_path(digest)),
+                    filepath,
+                    rendition_dir=self.rendition_dir,
+                    digest=digest,
+                    avif=self.avif
+                )
+            except Exception:
+                self.image_slots.release()
+                raise
+            future.add_done_callback(lambda _: self.image_slots.release())
+            return future
         except Exception as e:
             print(f"Error downloading image {image_url}: {e}")
+            result.set_result(None)
+            return result
+
+    def collect_image(self, future, image_url):
+        """Wait for a queued image and return its file names, or None if it failed"""
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error optimizing image {image_url}: {e}")
             return None
 
     def scrape_product(self, url):
@@ -48,15 +207,20 @@ class ProductScraper:
                 'name': soup.select_one('h1.product-title').text.strip(),
                 'price': float(soup.select_one('span.price').text.strip().replace('€', '')),
                 'description': soup.select_one('div.product-description').text.strip(),
-                'images': []
+                'images': [],
+                'renditions': []
             }
 
-            # Download images
+            # Download images and queue them for the worker processes, then collect them in order
             image_elements = soup.select('div.product-gallery img')
+            queued = []
             for img in image_elements:
                 image_url = urljoin(self.base_url, img['src'])
-                if image_filename := self.download_and_optimize_image(image_url, product['id']):
-                    product['images'].append(image_filename)
+                queued.append((image_url, self.download_and_optimize_image(image_url, product['id'])))
+            for image_url, future in queued:
+                if files := self.collect_image(future, image_url):
+                    product['images'].append(files['image'])
+                    product['renditions'].extend(files['renditions'])
 
             return product
         except Exception as e:
@@ -75,14 +239,26 @@ class ProductScraper:
             
             record = pb_client.collection('products').create(product_data)
 
-            # Upload images
-            for image_filename in product['images']:
+            # Upload images, once per distinct image content
+            for image_filename in dict.fromkeys(product['images']):
                 image_path = os.path.join(self.image_dir, image_filename)
                 with open(image_path, 'rb') as image_file:
                     pb_client.collection('products').update(record.id, {
                         'image': image_file,
                     })
 
+            # Upload the responsive renditions together
+            renditions = list(dict.fromkeys(product.get('renditions', [])))
+            if renditions:
+                rendition_files = [open(os.path.join(self.rendition_dir, name), 'rb') for name in renditions]
+                try:
+                    pb_client.collection('products').update(record.id, {
+                        'renditions': FileUpload(*[(name, f) for name, f in zip(renditions, rendition_files)]),
+                    })
+                finally:
+                    for f in rendition_files:
+                        f.close()
+
             return record
         except Exception as e:
             print(f"Error uploading product to PocketBase: {e}")